@@ -0,0 +1,191 @@
+"""
+Email pipeline throughput against an in-process SMTP sink.
+
+Starts an aiosmtpd server on localhost, then drives the registration,
+verification and password reset flows (token, template render, send) through
+EmailService, once with fastapi-mail (a new SMTP connection per message) and
+once with the SMTPConnectionPool used by the outbox worker. Reports messages
+per second, p50/p99 send latency and how many SMTP connections were opened.
+
+Needs no network, mail account, database or .env file:
+
+    python -m benchmarks.email_pipeline --users 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List
+
+from aiosmtpd.controller import Controller
+
+from benchmarks import use_placeholder_settings
+
+if TYPE_CHECKING:
+    from src.email.mail import EmailService
+
+
+class SinkHandler:
+    """Accepts every message and counts messages and connections."""
+    def __init__(self) -> None:
+        self.messages = 0
+        self.connections = 0
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        self.messages += 1
+        return "250 Message accepted"
+
+
+class SMTPSink(Controller):
+    def factory(self):
+        # called once per accepted connection
+        self.handler.connections += 1
+        return super().factory()
+
+    def reset(self) -> None:
+        self.handler.messages = 0
+        self.handler.connections = 0
+
+
+def start_sink() -> SMTPSink:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    sink = SMTPSink(SinkHandler(), hostname="127.0.0.1", port=port)
+    sink.start()
+    sink.reset()
+    return sink
+
+
+@dataclass
+class PipelineResult:
+    transport: str
+    messages: int
+    delivered: int
+    connections: int
+    elapsed: float
+    latencies: List[float] = field(repr=False)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed
+
+    def percentile(self, q: int) -> float:
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[q - 1]
+
+
+async def run_user_flows(email_service: "EmailService", user_index: int, latencies: List[float]) -> None:
+    """Registration, verification and password reset emails for one user, in order."""
+    from config import env_config
+    from src.auth.utils import create_url_safe_token, decode_url_safe_token
+
+    email = f"reader{user_index}@bookly.example"
+    user_name = f"reader{user_index}"
+
+    async def send(subject: str, template_name: str, data: Dict[str, str]) -> None:
+        start = time.perf_counter()
+        await email_service.send_html_mail_to_user_email(
+            email=email,
+            subject=subject,
+            html_template_data={"user_name": user_name, **data},
+            html_template_name=template_name
+        )
+        latencies.append(time.perf_counter() - start)
+
+    token = create_url_safe_token({"email": email})
+    await send("Verify your Bookly account", "verify_account.html", {
+        "verification_link": f"{env_config.FRONTEND_URL}/api/v1/auth/verify-email?token={token}"
+    })
+    decode_url_safe_token(token)
+    await send("Account is Verified - Bookly", "verified_acc_success.html", {
+        "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login"
+    })
+    token = create_url_safe_token({"email": email})
+    await send("Password Reset Request - Bookly", "password_reset_req.html", {
+        "password_reset_link": f"{env_config.FRONTEND_URL}/api/v1/auth/pswd-reset-confirm?token={token}"
+    })
+    decode_url_safe_token(token)
+    await send("Password Reset Successful - Bookly", "password_reset_succees.html", {
+        "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login"
+    })
+
+
+async def run_transport(transport: str, sink: SMTPSink, users: int, concurrency: int) -> PipelineResult:
+    from src.email.mail import EmailService, build_mail_config
+    from src.email.smtp import SMTPConnectionPool
+
+    smtp_pool = None
+    if transport == "pooled":
+        smtp_pool = SMTPConnectionPool(
+            size=concurrency,
+            hostname=sink.hostname,
+            port=sink.port,
+            use_tls=False,
+            start_tls=False,
+            use_credentials=False
+        )
+    email_service = EmailService(
+        config=build_mail_config(
+            MAIL_SERVER=sink.hostname,
+            MAIL_PORT=sink.port,
+            MAIL_STARTTLS=False,
+            MAIL_SSL_TLS=False,
+            USE_CREDENTIALS=False
+        ),
+        smtp_pool=smtp_pool
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one_user(i: int) -> None:
+        async with semaphore:
+            await run_user_flows(email_service, i, latencies)
+
+    sink.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(one_user(i) for i in range(users)))
+    elapsed = time.perf_counter() - start
+    if smtp_pool is not None:
+        await smtp_pool.close()
+    return PipelineResult(
+        transport=transport,
+        messages=len(latencies),
+        delivered=sink.handler.messages,
+        connections=sink.handler.connections,
+        elapsed=elapsed,
+        latencies=latencies,
+    )
+
+
+async def run_pipeline(users: int = 50, concurrency: int = 4) -> Dict[str, PipelineResult]:
+    sink = start_sink()
+    try:
+        return {
+            transport: await run_transport(transport, sink, users, concurrency)
+            for transport in ("fastapi-mail", "pooled")
+        }
+    finally:
+        sink.stop()
+
+
+def main(users: int, concurrency: int) -> None:
+    use_placeholder_settings("email-pipeline")
+    results = asyncio.run(run_pipeline(users, concurrency))
+    print(f"{users} users x 4 emails, concurrency={concurrency}")
+    print(f"{'transport':14} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'connections':>12} {'msg/conn':>9}")
+    for result in results.values():
+        print(
+            f"{result.transport:14} {result.messages_per_second:8.1f} "
+            f"{result.percentile(50) * 1000:8.2f} {result.percentile(99) * 1000:8.2f} "
+            f"{result.connections:12d} {result.delivered / max(result.connections, 1):9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    main(args.users, args.concurrency)
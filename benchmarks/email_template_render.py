@@ -0,0 +1,75 @@
+"""
+Renders per second for each email template.
+
+Compares the fastapi-mail path (a fresh jinja Environment per send, so the
+template is read and compiled every time) with the precompiled TemplateRegistry.
+Needs no database, SMTP server or settings:
+
+    python -m benchmarks.email_template_render
+"""
+import argparse
+import time
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader
+
+from src.email.registry import TEMPLATE_DIR, LINK_EXPIRY_TIME, TemplateRegistry
+
+USER_VARIABLES = {
+    "verify_account.html": {
+        "user_name": "reader_42",
+        "verification_link": "https://bookly.example/api/v1/auth/verify-email?token=abc.def.ghi",
+    },
+    "verified_acc_success.html": {
+        "user_name": "reader_42",
+        "login_url": "https://bookly.example/api/v1/auth/login",
+    },
+    "password_reset_req.html": {
+        "user_name": "reader_42",
+        "password_reset_link": "https://bookly.example/api/v1/auth/pswd-reset-confirm?token=abc.def.ghi",
+    },
+    "password_reset_succees.html": {
+        "user_name": "reader_42",
+        "login_url": "https://bookly.example/api/v1/auth/login",
+    },
+}
+
+STATIC_VARIABLES = {
+    "current_year": str(datetime.now().year),
+    "expiry_time": LINK_EXPIRY_TIME,
+}
+
+
+def render_like_fastapi_mail(template_name: str, variables: dict) -> str:
+    # what FastMail.send_message does for template_name=...: ConnectionConfig.template_engine()
+    # builds a new Environment, then get_template() loads and compiles the file
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+    return env.get_template(template_name).render(**variables, **STATIC_VARIABLES)
+
+
+def renders_per_second(render, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            render()
+        count += 50
+    return count / (time.perf_counter() - start)
+
+
+def main(seconds: float) -> None:
+    registry = TemplateRegistry()
+    registry.load()
+    print(f"{'template':30} {'per-send compile':>18} {'registry':>12} {'speedup':>8}")
+    for template_name in registry.template_names:
+        variables = USER_VARIABLES[template_name]
+        baseline = renders_per_second(lambda: render_like_fastapi_mail(template_name, variables), seconds)
+        cached = renders_per_second(lambda: registry.render(template_name, **variables), seconds)
+        print(f"{template_name:30} {baseline:14.0f}/s {cached:10.0f}/s {cached / baseline:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per template and variant")
+    args = parser.parse_args()
+    main(args.seconds)
@@ -0,0 +1,116 @@
+"""
+Requests per second on GET /test with the request logging middleware.
+
+Compares the previous BaseHTTPMiddleware implementation with the plain ASGI
+LoggingMiddleware. Each variant is a minimal app holding only that middleware
+and the /test route, driven in-process through httpx's ASGI transport. Log
+records still go through the queue handler but the listener discards them, so
+logs/app.log is left alone. Needs no database, Redis or .env file:
+
+    python -m benchmarks.logging_middleware --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.requests import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks import use_placeholder_settings
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware version LoggingMiddleware replaced."""
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        # the loggers read config, so they are imported once main() has set it up
+        from logger.app_logger import app_logger
+        from logger.user_logger import get_user_logger
+        self.app_logger = app_logger
+        self.get_user_logger = get_user_logger
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+
+        client = request.client
+        client_info = f"{client.host}:{client.port}" if client else "unknown"
+
+        message = (
+            f"{client_info} | "
+            f"{request.method} | "
+            f"{request.url.path} | "
+            f"{response.status_code} | "
+            f"{process_time:.4f}s"
+        )
+
+        self.app_logger.info(message)
+
+        user = getattr(request.state, "user", None)
+        if user:
+            user_logger = self.get_user_logger(user.username)
+            user_logger.info(
+                f"{request.method} {request.url.path} "
+                f"-> {response.status_code} "
+                f"in {process_time:.4f}s"
+            )
+
+        return response
+
+
+def build_app(middleware_class) -> FastAPI:
+    from main import root
+
+    app = FastAPI()
+    app.get("/test")(root)
+    app.add_middleware(middleware_class)
+    return app
+
+
+async def measure(app: FastAPI, seconds: float) -> tuple[float, float]:
+    """Sequential requests for `seconds`; returns requests/s and median latency in ms."""
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for _ in range(200):
+            await client.get("/test")
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            request_start = time.perf_counter()
+            response = await client.get("/test")
+            latencies.append(time.perf_counter() - request_start)
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000
+
+
+def main(seconds: float) -> None:
+    use_placeholder_settings("logging-middleware")
+    from logger.app_logger import app_logger
+    from logger.queue_logging import log_listener
+    from src.middleware import LoggingMiddleware
+
+    log_listener.add_route(app_logger.name, logging.NullHandler())
+    print(f"{'middleware':22} {'req/s':>8} {'p50 ms':>8}")
+    results = {}
+    for name, middleware_class in (
+        ("BaseHTTPMiddleware", LegacyLoggingMiddleware),
+        ("ASGI", LoggingMiddleware),
+    ):
+        results[name] = asyncio.run(measure(build_app(middleware_class), seconds))
+        rps, p50 = results[name]
+        print(f"{name:22} {rps:8.0f} {p50:8.3f}")
+    print(f"speedup: {results['ASGI'][0] / results['BaseHTTPMiddleware'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="time spent per variant")
+    args = parser.parse_args()
+    main(args.seconds)
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import EmailStr
 
@@ -7,6 +8,24 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
     ECHO_SQL: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    READ_YOUR_WRITES_SECONDS: int = 10
+    WARMUP_DB_CONNECTIONS: int = 5
+    REVIEW_PARTITION_MONTHS_AHEAD: int = 3
+    REVIEW_RETENTION_MONTHS: int = 0
+    SYNC_PAGE_SIZE: int = 200
+    SYNC_MAX_PAGE_SIZE: int = 1000
+    SYNC_SETTLE_SECONDS: float = 5.0
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_POLL_SECONDS: float = 60.0
     
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
@@ -29,6 +48,33 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: int = 3600
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_WORKER_METRICS_PORT: int = 9101
+    BULK_MAIL_CHUNK_SIZE: int = 100
+    BULK_MAIL_CONCURRENCY: int = 4
+    BULK_MAIL_JOB_TTL_SECONDS: int = 86400
+    BULK_MAIL_STALE_SECONDS: int = 300
+
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_OVERFLOW: Literal["drop", "block"] = "drop"
+    USER_LOGGER_CACHE_SIZE: int = 1024
+    USER_LOG_MAX_OPEN_FILES: int = 128
+    SLOW_REQUEST_QUERY_COUNT: int = 20
+    SLOW_REQUEST_SECONDS: float = 1.0
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_EXPORTER: Literal["jsonl", "otlp"] = "jsonl"
+    TRACE_FILE: str = "logs/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_SERVICE_NAME: str = "bookly-api"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
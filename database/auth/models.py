@@ -1,18 +1,24 @@
-from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlmodel import SQLModel, Field, Column, Index, Relationship, text
 import sqlalchemy.dialects.postgresql as pg
 
 from datetime import datetime
 from typing import List, Optional
 import uuid 
 
+from database.ids import uuid7
+
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # what database/purge.py still has to remove
+        Index("ix_users_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
     uid: uuid.UUID = Field(
         sa_column=Column(
             pg.UUID(as_uuid=True),
             primary_key=True,
             nullable=False,
-            default=uuid.uuid4,
+            default=uuid7,
         )
     )
     username: str = Field(index=True, unique=True)
@@ -28,19 +34,24 @@ class User(SQLModel, table=True):
         pg.TIMESTAMP, default=datetime.utcnow
     ))
     updated_at: datetime = Field(sa_column=Column(
-        pg.TIMESTAMP, default=datetime.utcnow
+        pg.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow
+    ))
+    # set by AuthService.delete_user; the account is purged later
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(
+        pg.TIMESTAMP, nullable=True
     ))
+    # lazy="raise": queries load these explicitly with selectinload()/noload()
     books: List["Books"] = Relationship(
         back_populates="user",
         sa_relationship_kwargs={
             "cascade": "all, delete-orphan",
-            "lazy": "selectin"}
+            "lazy": "raise"}
         )
     reviews: List["Reviews"] = Relationship(
         back_populates="user",
         sa_relationship_kwargs={
             "cascade": "all, delete-orphan",
-            "lazy": "selectin"}
+            "lazy": "raise"}
         )
     def __repr__(self) -> str:
         return f"<User[username={self.username}, email={self.email}]>"
\ No newline at end of file
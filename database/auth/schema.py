@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
-from typing import List
+from typing import List, Dict
 
 from database.books.schema import Book
 from database.reviews.schema import ReviewModel
@@ -40,7 +40,15 @@ class UserLoginModel(BaseModel):
     password: str
 
 class EmailModel(BaseModel):
-    addresses: List[str]
+    addresses: List[str] = Field(min_length=1)
+
+class BulkMailJobModel(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    sent: int
+    failed: int
+    failures: Dict[str, str]
 
 class PasswordResetRequestModel(BaseModel):
     email: str = Field(min_length=6)
@@ -1,17 +1,29 @@
-from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlmodel import SQLModel, Field, Column, Index, Relationship, text
 import sqlalchemy.dialects.postgresql as pg
 from datetime import datetime
 from typing import Optional, List
 import uuid 
 
+from database.ids import uuid7
+
 class Books(SQLModel, table=True):
     __tablename__ = "books"
+    # Reads skip soft-deleted books, so the read indexes only cover live ones.
+    __table_args__ = (
+        # get_user_books filters on user_uid and sorts on created_at; also serves User.books loads
+        Index("ix_books_user_uid_created_at", "user_uid", "created_at", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_books_created_at", "created_at", postgresql_where=text("deleted_at IS NULL")),
+        # keyset order of the changes feed (src/sync)
+        Index("ix_books_updated_at_uid", "updated_at", "uid", postgresql_where=text("deleted_at IS NULL")),
+        # what database/purge.py still has to remove
+        Index("ix_books_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
     uid: uuid.UUID = Field(
         sa_column=Column(
             pg.UUID(as_uuid=True),
             primary_key=True,
             nullable=False,
-            default=uuid.uuid4,
+            default=uuid7,
         )
     )
     title: str
@@ -30,14 +42,23 @@ class Books(SQLModel, table=True):
         pg.TIMESTAMP, default=datetime.utcnow
     ))
     updated_at: datetime = Field(sa_column=Column(
-        pg.TIMESTAMP, default=datetime.utcnow
+        pg.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow
+    ))
+    # bumped by every update; PATCH sends it back (If-Match) so concurrent edits can't overwrite each other
+    version: int = Field(default=1, sa_column=Column(
+        pg.INTEGER, nullable=False, default=1, server_default=text("1")
+    ))
+    # set by BookService.delete_book; the row and its reviews are purged later
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(
+        pg.TIMESTAMP, nullable=True
     ))
     user: Optional["User"] = Relationship(back_populates="books")
+    # lazy="raise": queries load reviews explicitly with selectinload()
     reviews: List["Reviews"] = Relationship(
         back_populates="book",
         sa_relationship_kwargs={
             "cascade": "all, delete-orphan",
-            "lazy": "selectin"}
+            "lazy": "raise"}
         )
 
 
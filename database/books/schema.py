@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 import uuid
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from database.reviews.schema import ReviewModel
 
@@ -15,6 +15,7 @@ class Book(BaseModel):
     language: str
     created_at: datetime
     updated_at: datetime
+    version: int
 
 class BookDetailWithReviewsModel(Book):
     reviews: List[ReviewModel]
@@ -32,4 +33,6 @@ class BookUpdateModel(BaseModel):
     author: str
     publisher: str
     page_count: int
-    language: str
\ No newline at end of file
+    language: str
+    # the version the edit is based on; an If-Match header takes precedence
+    version: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,31 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+# timestamp and random bits of the last uuid7 made by this process
+_last = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562, version 7): 48 bits of Unix time in
+    milliseconds followed by random bits. Keys made later sort after earlier
+    ones, so inserts append to the right edge of the primary key index
+    instead of splitting random pages. Fits the same uuid column as uuid4.
+
+    Within one millisecond the previous key is advanced by a random step
+    instead of drawing new random bits, so keys from this process stay
+    strictly increasing.
+    """
+    global _last
+    with _lock:
+        key = (time.time_ns() // 1_000_000) << 74 | int.from_bytes(os.urandom(10), "big") >> 6
+        if key <= _last:
+            # same millisecond, or the clock stepped back; may carry into the timestamp
+            key = _last + 1 + int.from_bytes(os.urandom(4), "big")
+        _last = key
+    # 48 bit timestamp, version 7, 12 random bits, RFC 4122 variant, 62 random bits
+    value = (key >> 74) << 80 | 0x7 << 76 | (key >> 62 & 0xFFF) << 64 | 0x2 << 62 | key & (1 << 62) - 1
+    return uuid.UUID(int=value)
@@ -1,19 +1,80 @@
-from sqlmodel import create_engine, text, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlmodel import text, SQLModel
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 from config import env_config
+from logger.app_logger import app_logger
+from metrics.app_metrics import instrument_engine
+from .query_stats import track_query_stats
+from .redis import has_recent_write, mark_recent_write
+from .replicas import ReplicaSet, RoutingSession
+from .slow_query import track_slow_queries
 
 from .models import Books, User, Reviews
 
-engine = create_engine(
-    url=env_config.DATABASE_URL,
-    echo=env_config.ECHO_SQL,
-    future=True
+
+def build_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        echo=env_config.ECHO_SQL,
+        pool_size=env_config.DB_POOL_SIZE,
+        max_overflow=env_config.DB_MAX_OVERFLOW,
+        pool_timeout=env_config.DB_POOL_TIMEOUT,
+        pool_recycle=env_config.DB_POOL_RECYCLE,
+        pool_pre_ping=env_config.DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": env_config.DB_STATEMENT_CACHE_SIZE}
+    )
+
+
+engine: AsyncEngine = build_engine(env_config.DATABASE_URL)
+instrument_engine(engine, "primary")
+track_query_stats(engine)
+slow_query_logs = [track_slow_queries(engine)]
+
+replica_set = ReplicaSet(
+    [build_engine(url.strip()) for url in env_config.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    max_lag=env_config.REPLICA_MAX_LAG_SECONDS,
+    check_interval=env_config.REPLICA_HEALTH_CHECK_SECONDS
 )
+for number, replica in enumerate(replica_set.engines):
+    # numbered in DATABASE_REPLICA_URLS order
+    instrument_engine(replica, f"replica{number}")
+    track_query_stats(replica)
+    slow_query_logs.append(track_slow_queries(replica))
+
 
-engine = AsyncEngine(engine)
+class RoutingAsyncSession(AsyncSession):
+    """
+    Opens the read-your-writes window of info["user_uid"] when a commit
+    included writes, so that user's next reads skip the replicas.
+    """
+    async def commit(self) -> None:
+        await super().commit()
+        user_uid = self.info.get("user_uid")
+        if self.info.pop("has_writes", False) and user_uid and replica_set.engines:
+            try:
+                await mark_recent_write(user_uid)
+            except Exception as e:
+                # the commit went through; only the user's next reads may be stale
+                app_logger.warning(f"Could not open read-your-writes window for {user_uid}: {e}")
+
+
+# built once at import instead of per request
+async_session_factory = async_sessionmaker(
+    bind=engine,
+    class_=RoutingAsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False
+)
+
+
+async def close_slow_query_logs() -> None:
+    await asyncio.gather(*(log.close() for log in slow_query_logs))
 
 
 async def init_db() -> None:
@@ -28,11 +89,41 @@ async def init_db() -> None:
 
 
 async def get_session() -> AsyncSession:
-    Session = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-    async with Session() as session:
+    async with async_session_factory() as session:
         yield session
 
+
+async def _open_replica_session(replica: AsyncEngine) -> AsyncSession | None:
+    session = async_session_factory(info={"replica": replica})
+    try:
+        # connect up front so an unreachable replica falls back to the primary
+        await session.connection()
+    except (OSError, DBAPIError, asyncio.TimeoutError) as e:
+        app_logger.warning(f"Read replica {replica.url.render_as_string()} unavailable: {e}")
+        replica_set.mark_failed(replica)
+        await session.close()
+        return None
+    return session
+
+
+@asynccontextmanager
+async def read_session(primary: AsyncSession, user_uid: str | None = None) -> AsyncIterator[AsyncSession]:
+    """
+    A session for read-only work on the next healthy replica. Falls back to
+    `primary` when there is none, or when user_uid wrote in the last
+    READ_YOUR_WRITES_SECONDS and must see its own changes.
+    """
+    replica = replica_set.choose()
+    if replica is not None and user_uid is not None:
+        try:
+            if await has_recent_write(user_uid):
+                replica = None
+        except Exception:
+            # without the window we cannot tell, so stay on the safe side
+            replica = None
+    session = await _open_replica_session(replica) if replica is not None else None
+    if session is None:
+        yield primary
+        return
+    async with session:
+        yield session
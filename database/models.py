@@ -1,3 +1,5 @@
 from .auth.models import User
 from .books.models import Books
-from .reviews.models import Reviews
\ No newline at end of file
+from .reviews.models import Reviews
+from .outbox.models import EmailOutbox
+from .sync.models import Tombstone
\ No newline at end of file
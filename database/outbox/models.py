@@ -0,0 +1,53 @@
+from sqlmodel import SQLModel, Field, Column, Index, text
+import sqlalchemy.dialects.postgresql as pg
+from datetime import datetime
+from typing import Optional
+import uuid 
+
+from database.ids import uuid7
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    An email waiting to be sent. Rows are written in the same transaction as
+    the user change that triggers them and drained by src/email/worker.py.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
+    uid: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+            default=uuid7,
+        )
+    )
+    recipient: str
+    subject: str
+    template_name: str
+    template_body: dict = Field(
+        sa_column=Column(pg.JSONB, nullable=False)
+    )
+    # pending -> sent, or pending -> failed once attempts are exhausted
+    status: str = Field(
+        sa_column=Column(pg.VARCHAR, nullable=False, default="pending", server_default="pending")
+    )
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = None
+    next_attempt_at: datetime = Field(sa_column=Column(
+        pg.TIMESTAMP, nullable=False, default=datetime.utcnow
+    ))
+    created_at: datetime = Field(sa_column=Column(
+        pg.TIMESTAMP, default=datetime.utcnow
+    ))
+    sent_at: Optional[datetime] = Field(default=None, sa_column=Column(
+        pg.TIMESTAMP, nullable=True
+    ))
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox[recipient={self.recipient}, status={self.status}, attempts={self.attempts}]>"
@@ -0,0 +1,151 @@
+"""
+Monthly range partitions of the reviews table.
+
+reviews is partitioned on created_at, one partition per calendar month named
+reviews_YYYY_MM. Partitions are created ahead of time, and months past the
+retention period are detached; run both from cron, e.g. daily:
+
+    python -m database.partitions create
+    python -m database.partitions detach --drop
+
+There is deliberately no default partition: it would make every new
+partition scan it, and it rules out DETACH ... CONCURRENTLY. Inserting a
+review into a month without a partition fails, so keep
+REVIEW_PARTITION_MONTHS_AHEAD well above the cron interval.
+"""
+import argparse
+import asyncio
+import re
+from datetime import date, datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import env_config
+
+PARENT = "reviews"
+PARTITION_NAME = re.compile(r"^reviews_(\d{4})_(\d{2})$")
+
+ATTACHED_PARTITIONS = text("""
+    SELECT child.relname, inh.inhdetachpending
+    FROM pg_inherits inh
+    JOIN pg_class child ON child.oid = inh.inhrelid
+    WHERE inh.inhparent = 'reviews'::regclass AND child.relkind = 'r'
+    ORDER BY child.relname
+""")
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    # created_at is written with datetime.utcnow()
+    return month_start(datetime.utcnow().date())
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """The month a reviews_YYYY_MM table holds, None for any other table name."""
+    match = PARTITION_NAME.match(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def attached_partitions(conn: Connection) -> List[Tuple[str, bool]]:
+    """(name, detach pending) of every partition currently attached to reviews."""
+    return [(name, pending) for name, pending in conn.execute(ATTACHED_PARTITIONS)]
+
+
+def create_partitions(conn: Connection, first: date, last: date) -> List[str]:
+    """Create the missing monthly partitions from `first` through `last`; returns the ones created."""
+    attached = {name for name, _ in attached_partitions(conn)}
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        if name not in attached:
+            # the partition inherits the primary key, the foreign keys and the ix_reviews_* indexes
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(conn: Connection, before: date, drop: bool = False) -> List[str]:
+    """
+    Detach every monthly partition that ends on or before `before`, and drop
+    it when `drop` is set; otherwise it stays behind as a plain table to be
+    archived. Returns the partitions detached.
+
+    DETACH ... CONCURRENTLY only takes a SHARE UPDATE EXCLUSIVE lock on
+    reviews, so reads and writes carry on, but it cannot run inside a
+    transaction: `conn` must be in autocommit mode. A detach that was
+    interrupted is completed with FINALIZE on the next run.
+    """
+    detached = []
+    for name, pending in attached_partitions(conn):
+        month = partition_month(name)
+        if month is None or add_months(month, 1) > before:
+            continue
+        mode = "FINALIZE" if pending else "CONCURRENTLY"
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} {mode}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+def create_upcoming_partitions(target, connection: Connection, **kw) -> None:
+    """
+    after_create hook of the reviews table, so metadata.create_all() gives a
+    usable table: this month and the next REVIEW_PARTITION_MONTHS_AHEAD.
+    """
+    this_month = current_month()
+    create_partitions(connection, this_month, add_months(this_month, env_config.REVIEW_PARTITION_MONTHS_AHEAD))
+
+
+async def main(command: str, months_ahead: int, retention_months: int, drop: bool) -> None:
+    engine = create_async_engine(env_config.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    this_month = current_month()
+    try:
+        async with engine.connect() as conn:
+            if command == "create":
+                names = await conn.run_sync(create_partitions, this_month, add_months(this_month, months_ahead))
+            elif retention_months > 0:
+                names = await conn.run_sync(detach_partitions, add_months(this_month, -retention_months), drop)
+            else:
+                print("REVIEW_RETENTION_MONTHS is 0, keeping every partition")
+                return
+    finally:
+        await engine.dispose()
+    verb = "created" if command == "create" else ("dropped" if drop else "detached")
+    print(f"{verb}: {', '.join(names) if names else 'nothing'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("create", "detach"))
+    parser.add_argument(
+        "--months-ahead", type=int, default=env_config.REVIEW_PARTITION_MONTHS_AHEAD,
+        help="create: partitions from this month through this many months ahead"
+    )
+    parser.add_argument(
+        "--retention-months", type=int, default=env_config.REVIEW_RETENTION_MONTHS,
+        help="detach: partitions that ended at least this many months before the current month began"
+    )
+    parser.add_argument("--drop", action="store_true", help="detach: drop the detached tables instead of keeping them")
+    args = parser.parse_args()
+    asyncio.run(main(args.command, args.months_ahead, args.retention_months, args.drop))
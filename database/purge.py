@@ -0,0 +1,137 @@
+"""
+Purge of soft-deleted books and users.
+
+DELETE /books/{id} and DELETE /auth/me only stamp deleted_at; the rows, and
+the reviews hanging off them, are removed here in small batches so a large
+account never turns into one long transaction holding locks on reviews.
+Run it next to the API:
+
+    python -m database.purge
+
+Each pass removes, at most PURGE_BATCH_SIZE rows per step and one
+transaction per step:
+
+1. reviews of soft-deleted books,
+2. reviews written by soft-deleted users,
+3. soft-deleted books with no reviews left,
+4. soft-deleted users with no books or reviews left.
+
+Deleted reviews get a tombstone for the changes feed; books already got
+theirs when they were soft-deleted.
+"""
+import asyncio
+import signal
+
+from sqlalchemy import exists, tuple_
+from sqlmodel import delete, select
+
+from config import env_config
+from database.main import engine, async_session_factory
+from database.models import Books, Reviews, User
+from database.sync.models import Tombstone
+from logger.app_logger import app_logger
+
+
+class PurgeJob:
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = env_config.PURGE_BATCH_SIZE,
+        poll_seconds: float = env_config.PURGE_POLL_SECONDS
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+
+    async def _purge_reviews(self, owner, owner_column) -> int:
+        """Delete one batch of reviews whose book or author is soft-deleted."""
+        # reviews is partitioned: (uid, created_at) is the primary key
+        batch = (
+            select(Reviews.uid, Reviews.created_at)
+            .join(owner, owner.uid == owner_column)
+            .where(owner.deleted_at.is_not(None))
+            .limit(self.batch_size)
+            .correlate(None)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(Reviews)
+                .where(tuple_(Reviews.uid, Reviews.created_at).in_(batch))
+                .returning(Reviews.uid)
+            )
+            review_uids = result.scalars().all()
+            session.add_all(Tombstone(kind="review", record_uid=uid) for uid in review_uids)
+            await session.commit()
+        return len(review_uids)
+
+    async def _purge_books(self) -> int:
+        batch = (
+            select(Books.uid)
+            .where(Books.deleted_at.is_not(None), ~exists().where(Reviews.book_uid == Books.uid))
+            .limit(self.batch_size)
+            .correlate(None)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(delete(Books).where(Books.uid.in_(batch)).returning(Books.uid))
+            purged = len(result.scalars().all())
+            await session.commit()
+        return purged
+
+    async def _purge_users(self) -> int:
+        batch = (
+            select(User.uid)
+            .where(
+                User.deleted_at.is_not(None),
+                ~exists().where(Books.user_uid == User.uid),
+                ~exists().where(Reviews.user_uid == User.uid),
+            )
+            .limit(self.batch_size)
+            .correlate(None)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(delete(User).where(User.uid.in_(batch)).returning(User.uid))
+            purged = len(result.scalars().all())
+            await session.commit()
+        return purged
+
+    async def purge_once(self) -> int:
+        """Run every step once and return how many rows were removed."""
+        counts = {
+            "reviews of deleted books": await self._purge_reviews(Books, Reviews.book_uid),
+            "reviews by deleted users": await self._purge_reviews(User, Reviews.user_uid),
+            "books": await self._purge_books(),
+            "users": await self._purge_users(),
+        }
+        purged = sum(counts.values())
+        if purged:
+            app_logger.info("Purged " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+        return purged
+
+    async def run(self, stop: asyncio.Event) -> None:
+        app_logger.info("Purge job started")
+        while not stop.is_set():
+            try:
+                purged = await self.purge_once()
+            except Exception:
+                app_logger.exception("Purge job failed to purge a batch")
+                purged = 0
+            if purged < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        app_logger.info("Purge job stopped")
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await PurgeJob(async_session_factory).run(stop)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
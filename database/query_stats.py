@@ -0,0 +1,53 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed, and time spent in them, for one request."""
+    count: int = 0
+    seconds: float = 0.0
+    scope: Dict[str, Any] | None = field(default=None, repr=False)
+
+    @property
+    def route(self) -> str:
+        """Method and route template of the request, once routing has matched it."""
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def track_query_stats(engine: AsyncEngine) -> None:
+    """
+    Add every statement the engine executes to the QueryStats of the current
+    request. The context variable is visible inside SQLAlchemy's greenlet, so
+    statements run by the async session are attributed to the request that
+    awaited them. Outside a request (worker, scripts) nothing is recorded.
+    """
+    def record(context) -> None:
+        stats = current_query_stats.get()
+        start = getattr(context, "query_start", None)
+        if stats is not None and start is not None:
+            stats.count += 1
+            stats.seconds += time.perf_counter() - start
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record(context)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # a failed statement (e.g. a unique violation) still hit the database
+        record(exception_context.execution_context)
@@ -1,5 +1,9 @@
 from redis.asyncio import Redis
+from typing import Dict
+import time
 from config import env_config
+from metrics.app_metrics import observe_redis
+from tracing.tracer import traced
 
 token_blocklist = Redis(
     host=env_config.REDIS_HOST,
@@ -9,6 +13,24 @@ token_blocklist = Redis(
     decode_responses=True
 )
 
+bulk_mail_store = Redis(
+    host=env_config.REDIS_HOST,
+    port=env_config.REDIS_PORT,
+    password=env_config.REDIS_PASSWORD,
+    db=1,
+    decode_responses=True
+)
+
+recent_writes = Redis(
+    host=env_config.REDIS_HOST,
+    port=env_config.REDIS_PORT,
+    password=env_config.REDIS_PASSWORD,
+    db=2,
+    decode_responses=True
+)
+
+@traced("redis.add_jti_to_blocklist")
+@observe_redis
 async def add_jti_to_blocklist(jti: str) -> None:
     """Add a token's JTI to the blocklist in Redis."""
     await token_blocklist.set(
@@ -17,7 +39,83 @@ async def add_jti_to_blocklist(jti: str) -> None:
         ex=env_config.JTI_EXPIRY_SECONDS 
     )
 
+@traced("redis.is_jti_in_blocklist")
+@observe_redis
 async def is_jti_in_blocklist(jti: str) -> bool:
     """Check if a token's JTI is in the blocklist in Redis."""
     jti_exsist = await token_blocklist.exists(jti) 
     return jti_exsist == 1
+
+@observe_redis
+async def mark_recent_write(user_uid: str) -> None:
+    """Send the user's reads to the primary for the next READ_YOUR_WRITES_SECONDS."""
+    await recent_writes.set(
+        name=f"recent_write:{user_uid}",
+        value="",
+        ex=env_config.READ_YOUR_WRITES_SECONDS
+    )
+
+@observe_redis
+async def has_recent_write(user_uid: str) -> bool:
+    """Check if the user wrote within the last READ_YOUR_WRITES_SECONDS."""
+    return await recent_writes.exists(f"recent_write:{user_uid}") == 1
+
+def _bulk_mail_key(job_id: str) -> str:
+    return f"bulk_mail:{job_id}"
+
+@observe_redis
+async def create_bulk_mail_job(job_id: str, total: int) -> None:
+    """Create the progress record of a bulk mail job in Redis."""
+    key = _bulk_mail_key(job_id)
+    async with bulk_mail_store.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={
+            "status": "queued", "total": total, "sent": 0, "failed": 0, "updated_at": time.time()
+        })
+        pipe.expire(key, env_config.BULK_MAIL_JOB_TTL_SECONDS)
+        await pipe.execute()
+
+@observe_redis
+async def set_bulk_mail_job_status(job_id: str, status: str) -> None:
+    """Update the status of a bulk mail job in Redis."""
+    await bulk_mail_store.hset(_bulk_mail_key(job_id), mapping={"status": status, "updated_at": time.time()})
+
+@observe_redis
+async def record_bulk_mail_results(job_id: str, sent: int, failures: Dict[str, str]) -> None:
+    """Add the outcome of one chunk of a bulk mail job to its counters in Redis."""
+    key = _bulk_mail_key(job_id)
+    async with bulk_mail_store.pipeline(transaction=True) as pipe:
+        pipe.hincrby(key, "sent", sent)
+        pipe.hincrby(key, "failed", len(failures))
+        # the heartbeat: a job that stops making progress is reported as stale
+        pipe.hset(key, "updated_at", time.time())
+        if failures:
+            pipe.hset(f"{key}:failures", mapping=failures)
+            pipe.expire(f"{key}:failures", env_config.BULK_MAIL_JOB_TTL_SECONDS)
+        await pipe.execute()
+
+@observe_redis
+async def get_bulk_mail_job(job_id: str) -> dict | None:
+    """
+    Return the progress of a bulk mail job from Redis, or None if it is unknown
+    or expired. A queued or running job whose heartbeat is older than
+    BULK_MAIL_STALE_SECONDS is reported as "stale": the process running it
+    has most likely stopped.
+    """
+    key = _bulk_mail_key(job_id)
+    async with bulk_mail_store.pipeline(transaction=False) as pipe:
+        pipe.hgetall(key)
+        pipe.hgetall(f"{key}:failures")
+        job, failures = await pipe.execute()
+    if not job:
+        return None
+    status = job["status"]
+    if status in ("queued", "running") and time.time() - float(job["updated_at"]) > env_config.BULK_MAIL_STALE_SECONDS:
+        status = "stale"
+    return {
+        "job_id": job_id,
+        "status": status,
+        "total": int(job["total"]),
+        "sent": int(job["sent"]),
+        "failed": int(job["failed"]),
+        "failures": failures,
+    }
@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import itertools
+import time
+from typing import Dict, List
+
+from sqlalchemy import Delete, Insert, Update, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from logger.app_logger import app_logger
+
+# seconds of replication lag; 0 on a primary or when everything received has been replayed
+REPLICATION_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class RoutingSession(Session):
+    """
+    Runs reads on the replica in info["replica"], when set, and everything
+    else on the primary.
+
+    Flushes, INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE always go to the
+    primary; after the first of them the whole session stays on the primary
+    and info["has_writes"] is set.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info["has_writes"] = True
+            self.info.pop("replica", None)
+        replica = self.info.get("replica")
+        if replica is not None:
+            return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out round-robin.
+
+    Every replica is health checked in the background, at most once per
+    `check_interval` seconds. Replicas that fail the check or a connection, or
+    lag more than `max_lag` seconds, are skipped until a later check passes.
+    choose() returns None when no replica is usable, so callers read from the
+    primary.
+    """
+    def __init__(self, engines: List[AsyncEngine], max_lag: float, check_interval: float) -> None:
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # last measured lag per replica; None when it could not be reached
+        self.lag: Dict[AsyncEngine, float | None] = {engine: 0.0 for engine in engines}
+        self._healthy: List[AsyncEngine] = list(engines)
+        self._counter = itertools.count()
+        self._checked_at = float("-inf")
+        self._refresh_task: asyncio.Task | None = None
+
+    def choose(self) -> AsyncEngine | None:
+        if not self.engines:
+            return None
+        self._schedule_refresh()
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        self.lag[engine] = None
+        self._update_healthy()
+
+    def _update_healthy(self) -> None:
+        self._healthy = [
+            engine for engine in self.engines
+            if self.lag[engine] is not None and self.lag[engine] <= self.max_lag
+        ]
+
+    def _schedule_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._checked_at = now
+        # started from an empty context so the checks are not counted or traced as part of this request
+        self._refresh_task = contextvars.Context().run(asyncio.create_task, self.refresh())
+
+    async def refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        lags = await asyncio.gather(*(self._measure_lag(engine) for engine in self.engines))
+        for engine, lag in zip(self.engines, lags):
+            was_healthy = engine in self._healthy
+            is_healthy = lag is not None and lag <= self.max_lag
+            if was_healthy and not is_healthy:
+                app_logger.warning(f"Read replica {engine.url.render_as_string()} skipped, lag={lag}")
+            elif is_healthy and not was_healthy:
+                app_logger.info(f"Read replica {engine.url.render_as_string()} back in rotation, lag={lag}")
+            self.lag[engine] = lag
+        self._update_healthy()
+
+    async def _measure_lag(self, engine: AsyncEngine) -> float | None:
+        async def query_lag() -> float:
+            async with engine.connect() as conn:
+                return float((await conn.execute(REPLICATION_LAG)).scalar_one())
+
+        try:
+            return await asyncio.wait_for(query_lag(), timeout=self.check_interval)
+        except Exception:
+            return None
@@ -1,34 +1,47 @@
-from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlalchemy import event
+from sqlmodel import SQLModel, Field, Column, Index, Relationship
 import sqlalchemy.dialects.postgresql as pg
 from datetime import datetime
 from typing import Optional
 import uuid 
 
+from database.ids import uuid7
+from database.partitions import create_upcoming_partitions
+
 class Reviews(SQLModel, table=True):
     __tablename__ = "reviews"
+    # one partition per month of created_at (database/partitions.py); the
+    # partition key has to be part of the primary key
+    __table_args__ = (
+        # keyset order of the changes feed (src/sync); not prunable, every partition's index is read
+        Index("ix_reviews_updated_at_uid", "updated_at", "uid"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     uid: uuid.UUID = Field(
         sa_column=Column(
             pg.UUID(as_uuid=True),
             primary_key=True,
             nullable=False,
-            default=uuid.uuid4,
+            default=uuid7,
         )
     )
     rating: int = Field(lt=5, gt=0)
     review_text: str
     user_uid: Optional[uuid.UUID] = Field(
         default=None,
-        foreign_key="users.uid"
+        foreign_key="users.uid",
+        index=True
     )
     book_uid: Optional[uuid.UUID] = Field(
         default=None,
-        foreign_key="books.uid"
+        foreign_key="books.uid",
+        index=True
     )
     created_at: datetime = Field(sa_column=Column(
-        pg.TIMESTAMP, default=datetime.utcnow
+        pg.TIMESTAMP, primary_key=True, nullable=False, default=datetime.utcnow
     ))
     updated_at: datetime = Field(sa_column=Column(
-        pg.TIMESTAMP, default=datetime.utcnow
+        pg.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow
     ))
     user: Optional["User"] = Relationship(back_populates="reviews")
     book: Optional["Books"] = Relationship(back_populates="reviews")
@@ -36,5 +49,6 @@ class Reviews(SQLModel, table=True):
 
     def __repr__(self) -> str:
         return f"<Review[Rating={self.rating}, reviewer={self.user.username if self.user else None}]>"
-    
 
+
+event.listen(Reviews.__table__, "after_create", create_upcoming_partitions)
@@ -0,0 +1,114 @@
+import asyncio
+import random
+import re
+import time
+from typing import Any, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from config import env_config
+from logger.slow_query_logger import slow_query_logger
+from .query_stats import current_query_stats
+
+# EXPLAIN ANALYZE runs the statement again, so only plain reads are explained:
+# no data-modifying CTEs and no SELECT ... FOR UPDATE/SHARE row locks
+EXPLAINABLE_PREFIXES = ("select", "with")
+WRITES_OR_LOCKS = re.compile(r"\b(insert|update|delete|merge)\b|\bfor\s+(key\s+)?share\b", re.IGNORECASE)
+MAX_CONCURRENT_EXPLAINS = 2
+
+
+def is_read_only(statement: str) -> bool:
+    return statement.lstrip().lower().startswith(EXPLAINABLE_PREFIXES) and not WRITES_OR_LOCKS.search(statement)
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> str:
+    """Types of the bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0], False)}" if rows else "0 rows"
+    if isinstance(parameters, dict):
+        return "(" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + ")"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+class SlowQueryLog:
+    """
+    Logs every statement slower than SLOW_QUERY_MS to logs/slow_queries.log,
+    with its bound-parameter types and the route that issued it.
+
+    A sample (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) of slow read-only SELECTs is re-run as
+    EXPLAIN (ANALYZE, BUFFERS) in a background task on a side connection
+    that is not taken from the application pool, and the plan is logged with
+    the entry. At most MAX_CONCURRENT_EXPLAINS run at once; the rest are
+    logged without a plan.
+    """
+    def __init__(self, engine: AsyncEngine, threshold_ms: float, explain_sample_rate: float) -> None:
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self._explain_engine: AsyncEngine | None = None
+        self._explains: Set[asyncio.Task] = set()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context.slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context.slow_query_start
+        if elapsed < self.threshold:
+            return
+        stats = current_query_stats.get()
+        entry = (
+            f"{elapsed * 1000:.1f} ms | "
+            f"{stats.route if stats is not None else '-'} | "
+            f"params {parameter_shape(parameters, executemany)} | "
+            f"{' '.join(statement.split())}"
+        )
+        if self._should_explain(statement, executemany):
+            task = asyncio.get_running_loop().create_task(self._explain(entry, statement, parameters))
+            self._explains.add(task)
+            task.add_done_callback(self._explains.discard)
+        else:
+            slow_query_logger.warning(entry)
+
+    def _should_explain(self, statement: str, executemany: bool) -> bool:
+        return (
+            not executemany
+            and is_read_only(statement)
+            and len(self._explains) < MAX_CONCURRENT_EXPLAINS
+            and random.random() < self.explain_sample_rate
+        )
+
+    async def _explain(self, entry: str, statement: str, parameters: Any) -> None:
+        if self._explain_engine is None:
+            self._explain_engine = create_async_engine(self.engine.url, poolclass=NullPool)
+        try:
+            async with self._explain_engine.connect() as conn:
+                await conn.exec_driver_sql(f"SET statement_timeout = {int(self.threshold * 10_000) + 1000}")
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan = "\n    ".join(row[0] for row in result)
+                await conn.rollback()
+            slow_query_logger.warning(f"{entry}\n    {plan}")
+        except Exception as e:
+            slow_query_logger.warning(f"{entry} | explain failed: {type(e).__name__}: {e}")
+
+    async def close(self) -> None:
+        """Stop explains still running and close their side connections."""
+        for task in list(self._explains):
+            task.cancel()
+        await asyncio.gather(*self._explains, return_exceptions=True)
+        if self._explain_engine is not None:
+            await self._explain_engine.dispose()
+            self._explain_engine = None
+
+
+def track_slow_queries(engine: AsyncEngine) -> SlowQueryLog:
+    return SlowQueryLog(
+        engine,
+        threshold_ms=env_config.SLOW_QUERY_MS,
+        explain_sample_rate=env_config.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    )
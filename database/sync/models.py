@@ -0,0 +1,48 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel, Field, Column, Index
+import sqlalchemy.dialects.postgresql as pg
+from datetime import datetime
+import uuid
+
+from database.ids import uuid7
+
+# tables whose deletes are published in the changes feed, and the kind they are reported as
+TOMBSTONE_KINDS = {"books": "book", "reviews": "review"}
+
+class Tombstone(SQLModel, table=True):
+    """
+    A deleted book or review, so the changes feed (src/sync) can tell
+    clients to drop their copy. Written in the same flush as the delete.
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_deleted_at_uid", "deleted_at", "uid"),
+    )
+    uid: uuid.UUID = Field(
+        sa_column=Column(
+            pg.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+            default=uuid7,
+        )
+    )
+    kind: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
+    record_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), nullable=False))
+    deleted_at: datetime = Field(sa_column=Column(
+        pg.TIMESTAMP, nullable=False, default=datetime.utcnow
+    ))
+
+    def __repr__(self) -> str:
+        return f"<Tombstone[{self.kind}={self.record_uid}]>"
+
+
+def record_tombstones(session: Session, flush_context, instances) -> None:
+    """before_flush hook: a Tombstone for every book and review being deleted."""
+    for instance in session.deleted:
+        kind = TOMBSTONE_KINDS.get(getattr(instance, "__tablename__", None))
+        if kind is not None:
+            session.add(Tombstone(kind=kind, record_uid=instance.uid))
+
+
+event.listen(Session, "before_flush", record_tombstones)
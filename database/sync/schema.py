@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+import uuid
+from datetime import datetime
+from typing import List
+
+from database.books.schema import Book
+from database.reviews.schema import ReviewModel
+
+class TombstoneModel(BaseModel):
+    kind: str
+    record_uid: uuid.UUID
+    deleted_at: datetime
+
+class SyncChangesModel(BaseModel):
+    books: List[Book]
+    reviews: List[ReviewModel]
+    deleted: List[TombstoneModel]
+    # pass back as ?cursor= to get the changes after this page
+    cursor: str
+    has_more: bool
@@ -2,6 +2,8 @@ import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+from .queue_logging import log_listener, queue_handler
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = BASE_DIR / Path("logs")
 
@@ -20,4 +22,6 @@ if not app_logger.handlers:
     )
 
     handler.setFormatter(formatter)
-    app_logger.addHandler(handler)
\ No newline at end of file
+    # the request path only enqueues; the listener thread does the file write
+    log_listener.add_route(app_logger.name, handler)
+    app_logger.addHandler(queue_handler)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from config import env_config
+from metrics.app_metrics import LOG_RECORDS_DROPPED_TOTAL
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue instead of writing them. When the queue is
+    full the record is dropped and counted ("drop"), or the caller waits for
+    space ("block"), depending on LOG_QUEUE_OVERFLOW.
+    """
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop") -> None:
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # emit() runs under the handler lock, so this increment is serialized
+            self.dropped += 1
+            LOG_RECORDS_DROPPED_TOTAL.inc()
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    A single background thread that writes every queued record. Each record
+    goes to the handler registered for its logger name, or for the nearest
+    parent name ("bookly_user.alice" falls back to "bookly_user").
+    """
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue, respect_handler_level=True)
+        self._routes: dict[str, logging.Handler] = {}
+        self._lock = threading.Lock()
+        self.running = False
+
+    def add_route(self, logger_name: str, handler: logging.Handler) -> None:
+        self._routes[logger_name] = handler
+
+    def handle(self, record: logging.LogRecord) -> None:
+        name = record.name
+        while name and name not in self._routes:
+            name = name.rpartition(".")[0]
+        handler = self._routes.get(name)
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        # the queue may be full; wait for room rather than losing the stop signal
+        self.queue.put(self._sentinel)
+
+    def start(self) -> None:
+        with self._lock:
+            if not self.running:
+                super().start()
+                self.running = True
+
+    def stop(self) -> None:
+        """Write out everything still queued, then flush and close the handlers."""
+        with self._lock:
+            if not self.running:
+                return
+            super().stop()
+            self.running = False
+            for handler in self._routes.values():
+                handler.flush()
+                handler.close()
+
+
+log_queue: queue.Queue = queue.Queue(maxsize=env_config.LOG_QUEUE_SIZE)
+queue_handler = BoundedQueueHandler(log_queue, overflow=env_config.LOG_QUEUE_OVERFLOW)
+log_listener = RoutingQueueListener(log_queue)
+
+log_listener.start()
+atexit.register(log_listener.stop)
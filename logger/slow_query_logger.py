@@ -0,0 +1,28 @@
+import logging
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from .queue_logging import log_listener, queue_handler
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOG_DIR = BASE_DIR / Path("logs")
+
+slow_query_logger = logging.getLogger("bookly_slow_query")
+slow_query_logger.setLevel(logging.INFO)
+slow_query_logger.propagate = False
+
+if not slow_query_logger.handlers:
+    handler = RotatingFileHandler(
+        LOG_DIR / "slow_queries.log",
+        maxBytes=5 * 1024 * 1024,
+        backupCount=5,
+        delay=True
+    )
+
+    formatter = logging.Formatter(
+        "%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    handler.setFormatter(formatter)
+    log_listener.add_route(slow_query_logger.name, handler)
+    slow_query_logger.addHandler(queue_handler)
\ No newline at end of file
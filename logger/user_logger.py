@@ -1,41 +1,102 @@
+import os
 import re
 import logging
+from collections import OrderedDict
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+from config import env_config
+from .queue_logging import log_listener, queue_handler
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 USER_LOG_DIR = BASE_DIR / Path("logs/user_logs")
 
+USER_LOGGER_PREFIX = "bookly_user"
+
 
 def sanitize_username(username: str) -> str:
     return re.sub(r"[^a-zA-Z0-9_-]", "_", username)
 
-_user_loggers = {}
 
-def get_user_logger(username: str) -> logging.Logger:
-    safe_username = sanitize_username(username)
+class UserLogFileHandler(logging.Handler):
+    """
+    Writes each record to logs/user_logs/<username>.log. Only the log listener
+    thread calls it, so the per-user files are opened and written off the
+    request path.
 
-    if safe_username in _user_loggers:
-        return _user_loggers[safe_username]
+    At most max_open_files files are kept open; the least recently written
+    one is closed to make room and reopened (in append mode) when needed.
+    """
+    def __init__(self, max_open_files: int = 128) -> None:
+        super().__init__()
+        self.max_open_files = max_open_files
+        self._handlers: OrderedDict[str, RotatingFileHandler] = OrderedDict()
+        self.formatter = logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(message)s"
+        )
 
-    logger = logging.getLogger(f"user_{safe_username}")
-    logger.setLevel(logging.INFO)
+    def _open(self, safe_username: str) -> RotatingFileHandler:
+        # os.path rather than pathlib, which interns every path part it parses
+        handler = RotatingFileHandler(
+            os.path.join(USER_LOG_DIR, f"{safe_username}.log"),
+            maxBytes=2 * 1024 * 1024,
+            backupCount=3
+        )
+        handler.setFormatter(self.formatter)
+        return handler
 
-    handler = RotatingFileHandler(
-        USER_LOG_DIR / f"{safe_username}.log",
-        maxBytes=2 * 1024 * 1024,
-        backupCount=3
-    )
+    def emit(self, record: logging.LogRecord) -> None:
+        safe_username = record.name[len(USER_LOGGER_PREFIX) + 1:]
+        handler = self._handlers.get(safe_username)
+        if handler is None:
+            if len(self._handlers) >= self.max_open_files:
+                _, evicted = self._handlers.popitem(last=False)
+                evicted.close()
+            handler = self._handlers[safe_username] = self._open(safe_username)
+        else:
+            self._handlers.move_to_end(safe_username)
+        handler.handle(record)
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(message)s"
-    )
+    @property
+    def open_files(self) -> int:
+        return len(self._handlers)
 
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.propagate = False
+    def flush(self) -> None:
+        for handler in self._handlers.values():
+            handler.flush()
 
-    _user_loggers[safe_username] = logger
-    return logger
+    def close(self) -> None:
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+# every user logger propagates to this parent, which owns the only queue handler
+_user_root = logging.getLogger(USER_LOGGER_PREFIX)
+_user_root.setLevel(logging.INFO)
+_user_root.propagate = False
+user_log_handler = UserLogFileHandler(max_open_files=env_config.USER_LOG_MAX_OPEN_FILES)
+if not _user_root.handlers:
+    _user_root.addHandler(queue_handler)
+    log_listener.add_route(USER_LOGGER_PREFIX, user_log_handler)
 
+_user_loggers: OrderedDict[str, logging.Logger] = OrderedDict()
 
+def get_user_logger(username: str) -> logging.Logger:
+    safe_username = sanitize_username(username)
+
+    logger = _user_loggers.get(safe_username)
+    if logger is not None:
+        _user_loggers.move_to_end(safe_username)
+        return logger
+
+    # built directly instead of logging.getLogger(), whose registry never
+    # forgets a name; an evicted logger is simply garbage collected
+    logger = logging.Logger(f"{USER_LOGGER_PREFIX}.{safe_username}")
+    logger.parent = _user_root
+
+    _user_loggers[safe_username] = logger
+    if len(_user_loggers) > env_config.USER_LOGGER_CACHE_SIZE:
+        _user_loggers.popitem(last=False)
+    return logger
@@ -1,22 +1,28 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Response, status
 from contextlib import asynccontextmanager
 
 from src.books.router import book_router
 from src.auth.router import auth_router
 from src.reviews.router import review_router
-from database.main import init_db
+from src.sync.router import sync_router
 from config import env_config
 from src.error import register_all_errors, register_internal_server_error_handler
-from src.middleware import register_middleware
+from src.middleware import register_middleware, public_route
+from src.auth.dependencies import RoleChecker
+from metrics.app_metrics import render_metrics
+from src.warmup import Warmup
+from database.main import close_slow_query_logs
 
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print(f"=====Starting up the server=====")
-    print("=====Initializing the database=====")
-    await init_db()
-    print("=====Database initialized=====")
+    # tables come from the alembic migrations; startup only warms up
+    print("=====Warming up=====")
+    await warmup.run()
+    print(f"=====Warm-up done in {warmup.seconds:.2f}s, ready={warmup.ready}=====")
     yield
     print(f"=====Shutting down the server=====")
+    await close_slow_query_logs()
 
 version = env_config.API_VERSION
 
@@ -24,7 +30,7 @@ app = FastAPI(
     title="Bookly",
     description="A REST API for book review and rating service",
     version=version,
-    # lifespan=life_span,
+    lifespan=life_span,
     docs_url=f"/api/{version}/docs",
     redoc_url=f"/api/{version}/redoc",
     contact={
@@ -33,7 +39,10 @@ app = FastAPI(
     }
 )
 
+warmup = Warmup(app, connections=env_config.WARMUP_DB_CONNECTIONS)
+
 @app.get("/test", tags=["Health"])
+@public_route
 def root():
     version = env_config.API_VERSION
     return {
@@ -44,6 +53,24 @@ def root():
         }
     }
 
+@app.get("/ready", tags=["Health"])
+@public_route
+async def ready(response: Response):
+    """
+    200 once warm-up has succeeded, 503 until then. Answers from the last
+    attempt's result right away; a new attempt runs in the background, so a
+    slow database never makes the probe itself time out.
+    """
+    if not warmup.ready:
+        warmup.retry_in_background()
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return warmup.status()
+
+@app.get("/metrics", tags=["Health"], dependencies=[Depends(RoleChecker(allowed_roles=["admin"]))])
+def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 register_all_errors(app)
 register_internal_server_error_handler(app)
 
@@ -51,4 +78,5 @@ register_middleware(app)
 
 app.include_router(book_router, prefix=f"/api/{version}/books", tags=["books"])
 app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=["auth"])
-app.include_router(review_router, prefix=f"/api/{version}/reviews", tags=["reviews"])
\ No newline at end of file
+app.include_router(review_router, prefix=f"/api/{version}/reviews", tags=["reviews"])
+app.include_router(sync_router, prefix=f"/api/{version}/sync", tags=["sync"])
\ No newline at end of file
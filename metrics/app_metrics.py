@@ -0,0 +1,134 @@
+"""
+Prometheus collectors shared by the API and the email outbox worker.
+
+Run with PROMETHEUS_MULTIPROC_DIR set in the process environment (it is read
+by prometheus_client itself, not from .env) and every uvicorn worker and the
+outbox worker write their samples to files in that directory, which
+render_metrics() aggregates. Empty the directory before starting the
+processes.
+"""
+import atexit
+import functools
+import os
+import time
+from typing import Awaitable, Callable, Tuple, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "bookly_http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "bookly_http_request_seconds",
+    "Time from receiving an HTTP request to sending the last response byte",
+    ["method", "route"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "bookly_http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "bookly_db_pool_checked_out",
+    "Database connections currently checked out of the pool, by engine (primary, replica0, ...)",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "bookly_db_pool_overflow",
+    "Database connections checked out beyond pool_size, by engine (primary, replica0, ...)",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+
+REDIS_CALL_SECONDS = Histogram(
+    "bookly_redis_call_seconds",
+    "Time taken by one Redis operation, including pipelines",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+EMAIL_OUTBOX_DEPTH = Gauge(
+    "bookly_email_outbox_depth",
+    "Emails waiting in the outbox",
+    multiprocess_mode="mostrecent"
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "bookly_email_send_seconds",
+    "Time taken to hand one email to the SMTP server"
+)
+EMAIL_SEND_TOTAL = Counter(
+    "bookly_email_send_total",
+    "Outbox send attempts by result",
+    ["result"]
+)
+
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    "bookly_log_records_dropped_total",
+    "Log records dropped because the logging queue was full (LOG_QUEUE_OVERFLOW=drop)"
+)
+
+if MULTIPROC_DIR:
+    # drop this process's live gauges (in-progress, pool) once it exits
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def metrics_registry() -> CollectorRegistry:
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The exposition payload and its content type."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Track pool usage through checkout and checkin events, labelled with `name`."""
+    pool = engine.sync_engine.pool
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine=name)
+    overflow = DB_POOL_OVERFLOW.labels(engine=name)
+
+    def on_checkout(*_) -> None:
+        checked_out.inc()
+        overflow.set(max(pool.checkedout() - pool.size(), 0))
+
+    def on_checkin(*_) -> None:
+        # fires before the pool takes the connection back
+        checked_out.dec()
+        overflow.set(max(pool.checkedout() - 1 - pool.size(), 0))
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+
+
+T = TypeVar("T")
+
+
+def observe_redis(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Time a Redis helper under its function name."""
+    histogram = REDIS_CALL_SECONDS.labels(operation=func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
@@ -11,6 +11,9 @@ from alembic import context
 from database.auth.models import User
 from database.books.models import Books
 from database.reviews import models
+from database.outbox import models as outbox_models
+from database.sync import models as sync_models
+from database.partitions import partition_month
 from sqlmodel import SQLModel
 from config import env_config
 
@@ -31,6 +34,13 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+
+def include_name(name, type_, parent_names):
+    # the monthly reviews_YYYY_MM partitions are managed by database/partitions.py
+    if type_ == "table":
+        return partition_month(name) is None
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +65,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -62,7 +73,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
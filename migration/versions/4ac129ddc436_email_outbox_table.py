@@ -0,0 +1,51 @@
+"""email outbox table
+
+Revision ID: 4ac129ddc436
+Revises: 81d9f8f6db70
+Create Date: 2026-10-19 09:12:41.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ac129ddc436'
+down_revision: Union[str, Sequence[str], None] = '81d9f8f6db70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_outbox',
+    sa.Column('uid', sa.UUID(), nullable=False),
+    sa.Column('recipient', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('template_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('template_body', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.VARCHAR(), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('next_attempt_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.Column('sent_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_index(
+        'ix_email_outbox_pending',
+        'email_outbox',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_outbox_pending', table_name='email_outbox', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('email_outbox')
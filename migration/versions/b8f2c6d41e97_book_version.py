@@ -0,0 +1,31 @@
+"""book version for optimistic concurrency
+
+Revision ID: b8f2c6d41e97
+Revises: a5e19b7c3d40
+Create Date: 2026-10-19 22:31:47.905213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f2c6d41e97'
+down_revision: Union[str, Sequence[str], None] = 'a5e19b7c3d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a constant default: existing rows get version 1 without rewriting the table
+    op.add_column('books', sa.Column('version', postgresql.INTEGER(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'version')
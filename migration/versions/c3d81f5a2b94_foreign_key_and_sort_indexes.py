@@ -0,0 +1,43 @@
+"""foreign key and sort indexes
+
+Revision ID: c3d81f5a2b94
+Revises: 4ac129ddc436
+Create Date: 2026-10-19 15:20:07.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d81f5a2b94'
+down_revision: Union[str, Sequence[str], None] = '4ac129ddc436'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_books_user_uid_created_at', 'books', ['user_uid', 'created_at']),
+    ('ix_books_created_at', 'books', ['created_at']),
+    ('ix_reviews_book_uid', 'reviews', ['book_uid']),
+    ('ix_reviews_user_uid', 'reviews', ['user_uid']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable during the build but cannot run
+    # inside a transaction. If a build fails it leaves an INVALID index
+    # behind; drop it and run the upgrade again.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,99 @@
+"""partition reviews by month
+
+Revision ID: e7b4c2d90a16
+Revises: c3d81f5a2b94
+Create Date: 2026-10-19 17:42:31.205714
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4c2d90a16'
+down_revision: Union[str, Sequence[str], None] = 'c3d81f5a2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'uid, rating, review_text, user_uid, book_uid, created_at, updated_at'
+
+# one partition per month from the oldest review through three months ahead;
+# `python -m database.partitions create` keeps adding them from there
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    part_month date := date_trunc('month', COALESCE(
+        (SELECT min(created_at) FROM reviews_unpartitioned), timezone('utc', now())
+    ));
+    last_month date := date_trunc('month', timezone('utc', now())) + interval '3 months';
+BEGIN
+    WHILE part_month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF reviews FOR VALUES FROM (%L) TO (%L)',
+            'reviews_' || to_char(part_month, 'YYYY_MM'), part_month, part_month + interval '1 month'
+        );
+        part_month := part_month + interval '1 month';
+    END LOOP;
+END $$
+"""
+
+
+def create_reviews_table(primary_key: Sequence[str], **kw) -> None:
+    op.create_table('reviews',
+    sa.Column('uid', sa.UUID(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('review_text', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('user_uid', sa.Uuid(), nullable=True),
+    sa.Column('book_uid', sa.Uuid(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable='created_at' not in primary_key),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=True),
+    # named explicitly: the partitions being copied from hold the generated
+    # names, and Postgres would otherwise pick reviews_book_uid_fkey1 and so on
+    sa.ForeignKeyConstraint(['book_uid'], ['books.uid'], name='reviews_book_uid_fkey'),
+    sa.ForeignKeyConstraint(['user_uid'], ['users.uid'], name='reviews_user_uid_fkey'),
+    sa.PrimaryKeyConstraint(*primary_key, name='reviews_pkey'),
+    **kw
+    )
+    op.create_index('ix_reviews_book_uid', 'reviews', ['book_uid'], unique=False)
+    op.create_index('ix_reviews_user_uid', 'reviews', ['user_uid'], unique=False)
+
+
+def rename_reviews_table(new_name: str) -> None:
+    # index names are schema wide, so the old table's indexes move out of the
+    # way too; the foreign keys only so the new ones get their usual names
+    op.rename_table('reviews', new_name)
+    op.execute(f'ALTER TABLE {new_name} RENAME CONSTRAINT reviews_book_uid_fkey TO {new_name}_book_uid_fkey')
+    op.execute(f'ALTER TABLE {new_name} RENAME CONSTRAINT reviews_user_uid_fkey TO {new_name}_user_uid_fkey')
+    op.execute(f'ALTER INDEX reviews_pkey RENAME TO {new_name}_pkey')
+    op.execute(f'ALTER INDEX ix_reviews_book_uid RENAME TO ix_{new_name}_book_uid')
+    op.execute(f'ALTER INDEX ix_reviews_user_uid RENAME TO ix_{new_name}_user_uid')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Copies every review in one transaction and holds an exclusive lock on
+    # reviews meanwhile; run it in a maintenance window.
+    rename_reviews_table('reviews_unpartitioned')
+    # created_at becomes the partition key and part of the primary key
+    op.execute(
+        "UPDATE reviews_unpartitioned SET created_at = COALESCE(updated_at, timezone('utc', now())) "
+        "WHERE created_at IS NULL"
+    )
+    create_reviews_table(('uid', 'created_at'), postgresql_partition_by='RANGE (created_at)')
+    op.execute(CREATE_PARTITIONS)
+    op.execute(f'INSERT INTO reviews ({COLUMNS}) SELECT {COLUMNS} FROM reviews_unpartitioned')
+    op.drop_table('reviews_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # partitions detached earlier are separate tables and are not copied back
+    rename_reviews_table('reviews_partitioned')
+    create_reviews_table(('uid',))
+    op.execute(f'INSERT INTO reviews ({COLUMNS}) SELECT {COLUMNS} FROM reviews_partitioned')
+    # drops the attached partitions with it
+    op.drop_table('reviews_partitioned')
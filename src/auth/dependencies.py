@@ -8,7 +8,7 @@ from typing import List
 
 from .utils import decode_access_token
 from database.redis import is_jti_in_blocklist
-from database.main import get_session
+from database.main import get_session, read_session
 from .service import AuthService
 from database.auth.models import User
 from src.error import InvalidTokenError, RevokedTokenError, InvalidCredentialsError,\
@@ -97,14 +97,47 @@ class RefreshTokenBearer(TokenBearer):
         if token_data and not token_data['refresh']:
             raise RefreshTokenRequiredError()
 
+# One instance for every route and dependency: FastAPI caches a dependency per
+# request by identity, so sharing it decodes the token and checks the
+# blocklist once, however many dependencies need the token.
+access_token_bearer = AccessTokenBearer()
+
 async def get_current_user(
-        token_details: dict = Depends(AccessTokenBearer()),
+        token_details: dict = Depends(access_token_bearer),
         session: AsyncSession = Depends(get_session)) -> dict:
     """
     Dependency function to retrieve the current user from the token data.
     """
     email = token_details['user']['email']
-    user = await user_service.get_user_by_email(email, session)
+    user = await user_service.get_user_auth_claims(email, session)
+    if not user:
+        raise UserNotFoundError()
+    # writes committed on this session open the user's read-your-writes window
+    session.info["user_uid"] = str(user.uid)
+    return user
+
+async def get_read_session(
+        token_details: dict = Depends(access_token_bearer),
+        session: AsyncSession = Depends(get_session)) -> AsyncSession:
+    """
+    Dependency for read-only routes: a read replica session, or the request's
+    primary session when no replica is usable or the user wrote recently.
+    The token's user_uid selects the read-your-writes window, so choosing
+    needs no query; the primary session stays unconnected on a replica read.
+    """
+    async with read_session(session, token_details['user']['user_uid']) as read_only_session:
+        yield read_only_session
+
+async def get_current_reader(
+        token_details: dict = Depends(access_token_bearer),
+        session: AsyncSession = Depends(get_read_session)) -> User:
+    """
+    get_current_user for read-only routes: the user is looked up on the read
+    session. A replica may trail by up to REPLICA_MAX_LAG_SECONDS, so a role
+    change or account deletion can take that long to reach reads; writes
+    always check the primary.
+    """
+    user = await user_service.get_user_auth_claims(token_details['user']['email'], session)
     if not user:
         raise UserNotFoundError()
     return user
@@ -120,3 +153,8 @@ class RoleChecker:
             return True
         raise InsufficientPermissionsError()
 
+class ReadRoleChecker(RoleChecker):
+    """RoleChecker for read-only routes, checked against the user from the read session."""
+    async def __call__(self, current_user: User = Depends(get_current_reader)) -> None:
+        return await super().__call__(current_user)
+
@@ -1,4 +1,4 @@
-from fastapi import status, APIRouter, Depends, BackgroundTasks
+from fastapi import status, APIRouter, Depends
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -10,69 +10,75 @@ from database.main import get_session
 from .service import AuthService
 from database.auth.schema import UserCreateModel, RegisterUseEmailResponseModel,\
     UserLoginModel, UserBookReviewModel, EmailModel, PasswordResetRequestModel,\
-    PasswordResetModel
+    PasswordResetModel, BulkMailJobModel
 from .utils import create_access_token, verify_password, create_url_safe_token,\
     decode_access_token, decode_url_safe_token, generate_password_hash
 from config import env_config
-from .dependencies import RefreshTokenBearer, AccessTokenBearer, get_current_user, RoleChecker
-from database.redis import add_jti_to_blocklist
+from .dependencies import RefreshTokenBearer, access_token_bearer, get_current_user, get_current_reader, get_read_session, ReadRoleChecker, RoleChecker
+from database.redis import add_jti_to_blocklist, get_bulk_mail_job
 from src.error import (
     UserNotFoundError, InvalidCredentialsError, InsufficientPermissionsError,\
-        FailedInVerifyingUserError, FailedInResettingPasswordError
+        FailedInVerifyingUserError, FailedInResettingPasswordError, BulkMailJobNotFoundError
 )
 from src.email.mail import EmailService
+from src.email.bulk import BulkMailService
+from src.email.outbox import OutboxService
 from logger.user_logger import get_user_logger
 from logger.app_logger import app_logger
+from src.middleware import public_route
 
 auth_router = APIRouter()
 auth_service = AuthService()
 email_service = EmailService()
+outbox_service = OutboxService()
+bulk_mail_service = BulkMailService()
 role_checker = RoleChecker(allowed_roles=["admin", "user"])
+reader_checker = ReadRoleChecker(allowed_roles=["admin", "user"])
+admin_checker = Depends(RoleChecker(allowed_roles=["admin"]))
 
-@auth_router.post('/send-mail')
+@auth_router.post('/send-mail', status_code=status.HTTP_202_ACCEPTED, dependencies=[admin_checker])
 async def send_mail(emails: EmailModel):
-    app_logger.inf(f"Inside send mail func {emails}")
-    emails = emails.addresses
+    app_logger.info(f"Inside send mail func, {len(emails.addresses)} addresses")
     html = "<h1>Welcome from Bookly</h1><p>This is a test email sent from the Bookly application.</p>"
-    message = email_service.create_message(emails, "Welcome to Bookly", html)
-    await email_service.mail.send_message(message)
-    return {"message": "Emails sent successfully."}
+    job_id = await bulk_mail_service.start_job(emails.addresses, "Welcome to Bookly", html)
+    return {
+        "message": "Bulk mail job accepted.",
+        "job_id": job_id,
+        "status_url": f"/api/{env_config.API_VERSION}/auth/send-mail/{job_id}"
+    }
+
+
+@auth_router.get('/send-mail/{job_id}', response_model=BulkMailJobModel, dependencies=[admin_checker])
+async def get_send_mail_status(job_id: str):
+    job = await get_bulk_mail_job(job_id)
+    if job is None:
+        raise BulkMailJobNotFoundError()
+    return job
 
 
 @auth_router.post('/register', response_model=RegisterUseEmailResponseModel, status_code=status.HTTP_201_CREATED)
+@public_route
 async def register_user(
     user_data: UserCreateModel,
-    bg_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
+    # staged before the insert so the email is committed together with the user
+    token_data = create_url_safe_token({"email": user_data.email})
+    outbox_service.enqueue(
+        session,
+        email=user_data.email,
+        subject="Verify your Bookly account",
+        html_template_data={
+            "user_name": user_data.username,
+            "verification_link": f"{env_config.FRONTEND_URL}/api/v1/auth/verify-email?token={token_data}"
+        },
+        html_template_name="verify_account.html"
+    )
     user = await auth_service.register_user(user_data, session)
     logger = get_user_logger(user.username)
     logger.info(f"Inside register user. email = {user.email}")
+    logger.info("User Created. Verification email queued")
     message = "User registered successfully. Please check your email to verify your account."
-    if user:
-        logger.info("User Created. Going to send email")
-        email_sent = True
-        try:
-            token_data = create_url_safe_token({"email": user.email})
-            logger.info("Token created for the user. sending email")
-            bg_tasks.add_task(
-                email_service.send_html_mail_to_user_email,
-                email=user.email,
-                subject="Verify your Bookly account",
-                html_template_data={
-                    "user_name": user.username,
-                    "verification_link": f"{env_config.FRONTEND_URL}/api/v1/auth/verify-email?token={token_data}",
-                    "current_year": str(datetime.now().year),
-                    "expiry_time": "10 minutes"
-                },
-                html_template_name="verify_account.html"
-            )
-            logger.info("Email sent")
-        except Exception as e:
-            logger.info(f"Error while sending email { str(e)}")
-            email_sent = False
-        if not email_sent:
-            message = "User registered successfully, but we could not send a verification email. Please verify your email address or request a resend."
     logger.info("Returing successfully after user registeration")
     return {
         "message": message,
@@ -80,9 +86,9 @@ async def register_user(
     }
 
 @auth_router.get('/verify-email', status_code=status.HTTP_200_OK)
+@public_route
 async def verify_email(
     token: str, 
-    bg_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)):
     app_logger.info("Inside verify email with token ")
     try:
@@ -92,7 +98,7 @@ async def verify_email(
         app_logger.info(f"Token data decode, email = {email}")
         user = None
         if email:
-            user = await auth_service.get_user_by_email(email, session)
+            user = await auth_service.get_user_auth_claims(email, session)
         if user is None:
             app_logger.error(f"User not found for email {email}")
             raise UserNotFoundError()
@@ -110,27 +116,22 @@ async def verify_email(
             "email": user.email,
             "is_verified": True
         }
+        user_logger.info("Queueing confirmation email")
+        outbox_service.enqueue(
+            session,
+            email=user.email,
+            subject="Account is Verified - Bookly",
+            html_template_data={
+                "user_name": user.username,
+                "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login"
+            },
+            html_template_name="verified_acc_success.html"
+        )
         user_logger.info("Going to update the user verfied flag")
         updated_user = await auth_service.update_user_data(user_data, session)
         if not updated_user.is_verified:
             user_logger.error("Failed in verifying the user")
             raise FailedInVerifyingUserError()
-        try:
-            user_logger.info("User verified. sending email")
-            bg_tasks.add_task(
-                email_service.send_html_mail_to_user_email,
-                email=user.email,
-                subject="Account is Verified - Bookly",
-                html_template_data={
-                    "user_name": user.username,
-                    "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login",
-                    "current_year": str(datetime.now().year),
-                },
-                html_template_name="verified_acc_success.html"
-            )   
-        except Exception as e:
-                user_logger.error(f"Could not send email {str(e)}")
-                pass
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -142,13 +143,14 @@ async def verify_email(
         raise FailedInVerifyingUserError()
 
 @auth_router.post('/login', status_code=status.HTTP_200_OK)
+@public_route
 async def login_user(
     user_login_data : UserLoginModel, 
     session: AsyncSession = Depends(get_session)
 ):
     email = user_login_data.email
     password = user_login_data.password
-    user = await auth_service.get_user_by_email(email, session)
+    user = await auth_service.get_user_auth_claims(email, session)
     if not user:
         raise UserNotFoundError()
     if not verify_password(password, user.password_hash):
@@ -188,6 +190,7 @@ async def login_user(
 
 
 @auth_router.get('/refresh-token', status_code=status.HTTP_200_OK)
+@public_route
 async def get_new_access_token(token_details :dict = Depends(RefreshTokenBearer())):
     try:
         expiry_timestamp = token_details.get("exp")
@@ -210,15 +213,31 @@ async def get_new_access_token(token_details :dict = Depends(RefreshTokenBearer(
 
 @auth_router.get('/me', response_model=UserBookReviewModel, status_code=status.HTTP_200_OK)
 async def get_current_user(
-        user = Depends(get_current_user), 
-        _:bool = Depends(role_checker)
+        user = Depends(get_current_reader), 
+        _:bool = Depends(reader_checker),
+        session: AsyncSession = Depends(get_read_session)
+    ):
+    return await auth_service.get_user_profile(user.email, session)
+
+
+@auth_router.delete('/me', status_code=status.HTTP_200_OK)
+async def delete_current_user(
+        user = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session)
     ):
-    return user
+    # only flips deleted_at; the account, its books and reviews are purged in the background
+    await auth_service.delete_user(user.uid, session)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "message": "Account deleted."
+        }
+    )
 
 
 @auth_router.post('/logout', status_code=status.HTTP_200_OK)
 async def logout_user(
-    token_details :dict = Depends(AccessTokenBearer()),
+    token_details :dict = Depends(access_token_bearer),
 ):
     try:
         jti = token_details.get("jti")
@@ -236,44 +255,34 @@ async def logout_user(
 @auth_router.post('/pswd-reset-req', status_code=status.HTTP_200_OK)
 async def password_reset_request(
     email_data: PasswordResetRequestModel, 
-    bg_tasks: BackgroundTasks,
     session: AsyncSession=Depends(get_session)):
     email = email_data.email
-    user = await auth_service.get_user_by_email(email, session)
+    user = await auth_service.get_user_auth_claims(email, session)
     if not user:
         raise UserNotFoundError()
-    email_sent = True
-    try:
-        token_data = create_url_safe_token({"email": user.email})
-        bg_tasks.add_task(
-        email_service.send_html_mail_to_user_email,
-            email=user.email,
-            subject="Password Reset Request - Bookly",
-            html_template_data={
-                "user_name": user.username,
-                "password_reset_link": f"{env_config.FRONTEND_URL}/api/v1/auth/pswd-reset-confirm?token={token_data}",
-                "current_year": str(datetime.now().year),
-                "expiry_time": "10 minutes"
-            },
-            html_template_name="password_reset_req.html"
-        )
-        message = "Password reset email sent successfully. Please check your email."
-    except Exception as e:
-        email_sent = False
-    if not email_sent:
-        message = "Failed to send password reset email. Please try again later."
+    token_data = create_url_safe_token({"email": user.email})
+    outbox_service.enqueue(
+        session,
+        email=user.email,
+        subject="Password Reset Request - Bookly",
+        html_template_data={
+            "user_name": user.username,
+            "password_reset_link": f"{env_config.FRONTEND_URL}/api/v1/auth/pswd-reset-confirm?token={token_data}"
+        },
+        html_template_name="password_reset_req.html"
+    )
+    await session.commit()
     
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
-            "message": message
+            "message": "Password reset email sent successfully. Please check your email."
         }
     )
 
 @auth_router.post('/pswd-reset-confirm', status_code=status.HTTP_200_OK)
 async def reset_user_account_password(
     token: str, passwords:PasswordResetModel, 
-    bg_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
     ):
     if passwords.new_password != passwords.confirm_new_password:
@@ -305,7 +314,7 @@ async def reset_user_account_password(
 
     user = None
     if email:
-        user = await auth_service.get_user_by_email(email, session)
+        user = await auth_service.get_user_auth_claims(email, session)
     if user is None:
         raise UserNotFoundError()
     hashed_password = generate_password_hash(passwords.new_password)
@@ -313,22 +322,18 @@ async def reset_user_account_password(
         "email":email,
         "password_hash": hashed_password
     }
+    outbox_service.enqueue(
+        session,
+        email=user.email,
+        subject="Password Reset Successful - Bookly",
+        html_template_data={
+            "user_name": user.username,
+            "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login"
+        },
+        html_template_name="password_reset_succees.html"
+    )
     updated_user = await auth_service.update_user_data(user_data, session)
     if updated_user:
-        try:
-            bg_tasks.add_task(
-                email_service.send_html_mail_to_user_email,
-                email=user.email,
-                subject="Password Reset Successful - Bookly",
-                html_template_data={
-                    "user_name": user.username,
-                    "login_url": f"{env_config.FRONTEND_URL}/api/v1/auth/login",
-                    "current_year": str(datetime.now().year),
-                },
-                html_template_name="password_reset_succees.html"
-            )   
-        except Exception as e:
-                pass
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -1,49 +1,126 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import select, update
+from sqlalchemy import exists
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, noload, selectinload
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime
+import uuid
 from database.auth.models import User
 from database.auth.schema import UserCreateModel
-from .utils import generate_password_hash, verify_password
+from database.books.models import Books
+from database.reviews.models import Reviews
+from database.sync.models import Tombstone
+from .utils import generate_password_hash
 from src.error import UserAlreadyExistsError, UsernameAlreadyTakenError, UserNotFoundError
 from logger.user_logger import get_user_logger
+from tracing.tracer import trace_methods
 
+# Columns needed to authenticate and authorize a user. Relationships are never
+# loaded for these lookups and touching any other column raises instead of
+# silently issuing another query.
+AUTH_CLAIM_OPTIONS = (
+    load_only(
+        User.uid,
+        User.username,
+        User.email,
+        User.role,
+        User.is_verified,
+        User.password_hash,
+        raiseload=True
+    ),
+    noload(User.books),
+    noload(User.reviews),
+)
+
+USERNAME_UNIQUE_CONSTRAINT = "ix_users_username"
+
+# soft-deleted accounts are invisible to every read; their tokens stop working
+NOT_DELETED = User.deleted_at.is_(None)
+
+# Everything the /auth/me response serializes: the user's books (without their
+# reviews) and the user's own reviews, both without soft-deleted books.
+PROFILE_OPTIONS = (
+    selectinload(User.books.and_(Books.deleted_at.is_(None))).noload(Books.reviews),
+    selectinload(User.reviews.and_(
+        ~exists().where(Books.uid == Reviews.book_uid, Books.deleted_at.is_not(None))
+    )),
+)
+
+@trace_methods
 class AuthService:
     async def get_user_by_email(self, email: str, session: AsyncSession) -> User | None:
-        query = select(User).where(User.email == email)
+        query = select(User).where(User.email == email, NOT_DELETED)
+        result = await session.execute(query)
+        user = result.scalar_one_or_none()
+        return user
+
+    async def get_user_auth_claims(self, email: str, session: AsyncSession) -> User | None:
+        """Load only the columns used for login, token checks and role checks."""
+        query = select(User).where(User.email == email, NOT_DELETED).options(*AUTH_CLAIM_OPTIONS)
+        result = await session.execute(query)
+        user = result.scalar_one_or_none()
+        return user
+
+    async def get_user_profile(self, email: str, session: AsyncSession) -> User | None:
+        """Load a user together with the relationships served by /auth/me."""
+        query = (
+            select(User)
+            .where(User.email == email, NOT_DELETED)
+            .options(*PROFILE_OPTIONS)
+            # the same user may already sit in the identity map as an auth-claims projection
+            .execution_options(populate_existing=True)
+        )
         result = await session.execute(query)
         user = result.scalar_one_or_none()
         return user
     
     async def check_user_exists(self, email: str, session: AsyncSession) -> bool:
-        user = await self.get_user_by_email(email, session)
-        return True if user is not None else False
+        query = select(User.uid).where(User.email == email, NOT_DELETED).limit(1)
+        result = await session.execute(query)
+        return result.first() is not None
 
     async def register_user(self, user_data: UserCreateModel, session: AsyncSession) -> User:
+        """
+        Create the user with a single INSERT ... ON CONFLICT (email) DO NOTHING RETURNING.
+        No returned row means the email is taken; a unique violation on the
+        username index means the username is taken.
+        """
         user_data_dict = user_data.model_dump()
-        new_user = User(**user_data_dict)
-        new_user.password_hash = generate_password_hash(user_data_dict['password'])
-        new_user.role = "user"
-        user_exists = await self.check_user_exists(user_data_dict["email"], session)
-        if user_exists:
-            raise UserAlreadyExistsError()
+        password = user_data_dict.pop("password")
+        # bcrypt is deliberately slow, keep it off the event loop
+        password_hash = await run_in_threadpool(generate_password_hash, password)
+        query = (
+            insert(User)
+            .values(
+                **user_data_dict,
+                password_hash=password_hash,
+                role="user",
+                is_verified=False
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+            .options(noload(User.books), noload(User.reviews))
+        )
         try:
-            session.add(new_user)
-            await session.commit()
-            await session.refresh(new_user)
-            return new_user
+            result = await session.execute(query)
+            new_user = result.scalar_one_or_none()
         except IntegrityError as e:
             await session.rollback()
-            msg = str(e.orig)
-            if "ix_users_username" in msg:
-                raise UsernameAlreadyTakenError();
-        except Exception as e:
-            await session.rollback()
+            if violated_constraint(e) == USERNAME_UNIQUE_CONSTRAINT:
+                raise UsernameAlreadyTakenError()
             raise e
+        if new_user is None:
+            await session.rollback()
+            raise UserAlreadyExistsError()
+        await session.commit()
+        return new_user
     
     async def update_user_data(self, user_data, session: AsyncSession) -> User | None:
         email = user_data.get("email")
-        user = await self.get_user_by_email(email, session)
+        user = await self.get_user_auth_claims(email, session)
         if not user:
             raise UserNotFoundError()
         for key, value in user_data.items():
@@ -51,6 +128,34 @@ class AuthService:
                 continue
             setattr(user, key, value)
         await session.commit()
-        await session.refresh(user)
         return user
-        
+
+    async def delete_user(self, user_uid: uuid.UUID, session: AsyncSession) -> None:
+        """
+        Soft delete the account and its books. The email and username stay
+        taken until database/purge.py removes the user, its books and every
+        review it wrote.
+        """
+        deleted_at = datetime.utcnow()
+        await session.execute(
+            update(User).where(User.uid == user_uid, NOT_DELETED).values(deleted_at=deleted_at)
+        )
+        result = await session.execute(
+            update(Books)
+            .where(Books.user_uid == user_uid, Books.deleted_at.is_(None))
+            .values(deleted_at=deleted_at)
+            .returning(Books.uid)
+        )
+        session.add_all(Tombstone(kind="book", record_uid=book_uid) for book_uid in result.scalars())
+        await session.commit()
+
+
+def violated_constraint(error: IntegrityError) -> str | None:
+    """Return the name of the constraint behind an IntegrityError, if the driver reports it."""
+    cause = error.orig.__cause__ if error.orig is not None else None
+    constraint_name = getattr(cause, "constraint_name", None)
+    if constraint_name:
+        return constraint_name
+    if USERNAME_UNIQUE_CONSTRAINT in str(error.orig):
+        return USERNAME_UNIQUE_CONSTRAINT
+    return None
@@ -7,6 +7,7 @@ import jwt
 import uuid
 import logging
 from config import env_config
+from tracing.tracer import traced
 
 
 pwd_context = CryptContext(
@@ -41,6 +42,7 @@ def create_access_token(user_data: dict,expiry: timedelta = None, refresh:bool =
     return token
 
 
+@traced("jwt.decode_access_token")
 def decode_access_token(token: str) -> dict | None:
     """Decode a JWT access token and return the payload."""
     try:
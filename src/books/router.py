@@ -1,4 +1,4 @@
-from fastapi import status, APIRouter, Depends
+from fastapi import status, APIRouter, Depends, Header, Response
 from fastapi.exceptions import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
@@ -7,27 +7,47 @@ import uuid
 from database.books.schema import Book, BookUpdateModel, BookCreateModel, BookDetailWithReviewsModel
 from database.main import get_session
 from .service import BookService
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.auth.dependencies import ReadRoleChecker, RoleChecker, access_token_bearer, get_read_session
 from src.error import InsufficientPermissionsError, BookNotFoundError
 
 book_router = APIRouter()
 books_service = BookService()
-access_token_bearer = AccessTokenBearer()
 role_checker = Depends(RoleChecker(allowed_roles=["admin", "user"]))
+# read-only routes check the role on the same replica session they read from
+reader_checker = Depends(ReadRoleChecker(allowed_roles=["admin", "user"]))
 
-@book_router.get("/", response_model=List[BookDetailWithReviewsModel],  dependencies=[role_checker])
+def book_etag(book: Book) -> str:
+    return f'"{book.version}"'
+
+def if_match_versions(if_match: str) -> tuple[int, ...] | None:
+    """
+    The versions an If-Match header accepts; None for `*` (any current
+    version). An empty tuple matches nothing, but the book must still be
+    found first, so a missing book stays a 404 rather than a 412.
+    """
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return None
+        # only our own strong tags can match; weak or foreign tags never do
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return tuple(versions)
+
+@book_router.get("/", response_model=List[BookDetailWithReviewsModel],  dependencies=[reader_checker])
 async def get_all_books(
-    session:AsyncSession = Depends(get_session),
+    session:AsyncSession = Depends(get_read_session),
     token_details: dict = Depends(access_token_bearer),
     # _:bool = Depends(role_checker)
     ) -> List[Book]:
     books = await books_service.get_all_books(session)
     return books
 
-@book_router.get('/user/{user_id}', response_model=List[BookDetailWithReviewsModel],  dependencies=[role_checker])
+@book_router.get('/user/{user_id}', response_model=List[BookDetailWithReviewsModel],  dependencies=[reader_checker])
 async def get_user_books(
     user_id:str,
-    session:AsyncSession = Depends(get_session),
+    session:AsyncSession = Depends(get_read_session),
     token_details: dict = Depends(access_token_bearer),
     # _:bool = Depends(role_checker)
     ) -> List[Book]:
@@ -37,14 +57,16 @@ async def get_user_books(
     books = await books_service.get_user_books(session, user_id)
     return books
 
-@book_router.get("/{book_id}", response_model=BookDetailWithReviewsModel, dependencies=[role_checker])
+@book_router.get("/{book_id}", response_model=BookDetailWithReviewsModel, dependencies=[reader_checker])
 async def get_book(
     book_id: uuid.UUID,
-    session:AsyncSession = Depends(get_session),
+    response: Response,
+    session:AsyncSession = Depends(get_read_session),
     token_details: dict = Depends(access_token_bearer)) -> Book:
     book = await books_service.get_book_by_id(session, book_id)
     if not book:
         raise BookNotFoundError()
+    response.headers["ETag"] = book_etag(book)
     return book
 
 @book_router.post("/",status_code=status.HTTP_201_CREATED, response_model=BookDetailWithReviewsModel, dependencies=[role_checker])
@@ -56,17 +78,25 @@ async def add_book(
     new_book = await books_service.create_book(session, book_data, user_uid)
     return new_book
 
-@book_router.patch("/{book_id}",status_code=status.HTTP_404_NOT_FOUND, response_model=BookDetailWithReviewsModel, dependencies=[role_checker])
+@book_router.patch("/{book_id}",status_code=status.HTTP_200_OK, response_model=BookDetailWithReviewsModel, dependencies=[role_checker])
 async def update_book(
     book_id: uuid.UUID, updated_book: BookUpdateModel, 
+    response: Response,
+    if_match: str | None = Header(default=None),
     session:AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer))-> Book:
-    book = await books_service.update_book(session, book_id, updated_book)
+    # the version the client last saw: the ETag it got back, or the body's version
+    if if_match:
+        versions = if_match_versions(if_match)
+    else:
+        versions = None if updated_book.version is None else (updated_book.version,)
+    book = await books_service.update_book(session, book_id, updated_book, versions)
     if book:
+        response.headers["ETag"] = book_etag(book)
         return book
     raise BookNotFoundError()
 
-@book_router.delete("/{book_id}",status_code=status.HTTP_404_NOT_FOUND, dependencies=[role_checker])
+@book_router.delete("/{book_id}",status_code=status.HTTP_200_OK, dependencies=[role_checker])
 async def delete_book(
     book_id: uuid.UUID, 
     session:AsyncSession = Depends(get_session),
@@ -1,27 +1,46 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, desc
-from typing import List
+from sqlmodel import select, desc, update
+from sqlalchemy.orm import selectinload
+from typing import Collection, List
 import uuid
 from datetime import datetime
 
 from database.books.schema import BookCreateModel, BookUpdateModel, Book
 from database.books.models import Books
+from database.sync.models import Tombstone
+from src.error import BookVersionMismatchError
+from tracing.tracer import trace_methods
 
+# Relationships are lazy="raise"; book responses serialize the reviews, so
+# every query returning them loads them up front.
+BOOK_DETAIL_OPTIONS = (
+    selectinload(Books.reviews),
+)
+
+# soft-deleted books are invisible to every read; matches the partial indexes on books
+NOT_DELETED = Books.deleted_at.is_(None)
+
+@trace_methods
 class BookService:
     async def get_all_books(self, session: AsyncSession) -> List[Book]:
-        query = select(Books).order_by(desc(Books.created_at))
+        query = select(Books).where(NOT_DELETED).options(*BOOK_DETAIL_OPTIONS).order_by(desc(Books.created_at))
         result = await session.execute(query)
         books = result.scalars().all()
         return books
     
     async def get_book_by_id(self, session: AsyncSession, book_id: uuid.UUID) -> Book | None: 
-        query = select(Books).where(Books.uid == book_id)
+        query = select(Books).where(Books.uid == book_id, NOT_DELETED).options(*BOOK_DETAIL_OPTIONS)
         result = await session.execute(query)
         book = result.scalar_one_or_none()
         return book
     
     async def get_user_books(self, session: AsyncSession, user_uid: str) -> List[Book]:
-        query = select(Books).where(Books.user_uid == user_uid).order_by(desc(Books.created_at))
+        query = (
+            select(Books)
+            .where(Books.user_uid == user_uid, NOT_DELETED)
+            .options(*BOOK_DETAIL_OPTIONS)
+            .order_by(desc(Books.created_at))
+        )
         result = await session.execute(query)
         books = result.scalars().all()
         return books
@@ -32,23 +51,59 @@ class BookService:
         new_book.user_uid = user_uid
         session.add(new_book)
         await session.commit()
-        await session.refresh(new_book)
-        return new_book
+        # reload with the reviews collection the response needs
+        return await self.get_book_by_id(session, new_book.uid)
 
-    async def update_book(self, session: AsyncSession, book_id: uuid.UUID, book_data: BookUpdateModel) -> Book | None:
-        book_to_update = await self.get_book_by_id(session, book_id)  
+    async def update_book(
+        self, session: AsyncSession, book_id: uuid.UUID, book_data: BookUpdateModel,
+        versions: Collection[int] | None = None
+    ) -> Book | None:
+        """
+        Compare-and-set on the version column: a single UPDATE ... WHERE
+        version IN :versions, with no read or row lock beforehand. Returns None
+        if the book does not exist, then raises BookVersionMismatchError if it
+        is at none of `versions` (an empty collection never matches); without
+        versions the update applies unconditionally.
+        """
+        query = (
+            update(Books)
+            .where(Books.uid == book_id, NOT_DELETED)
+            .values(**book_data.model_dump(exclude={"version"}), version=Books.version + 1)
+            .returning(Books)
+            .options(*BOOK_DETAIL_OPTIONS)
+            .execution_options(populate_existing=True)
+        )
+        if versions is not None:
+            query = query.where(Books.version.in_(versions))
+        result = await session.execute(query)
+        book_to_update = result.scalar_one_or_none()
         if book_to_update:
-            updated_book_data = book_data.model_dump()
-            for key, value in updated_book_data.items():
-                setattr(book_to_update, key, value) 
             await session.commit()
-            await session.refresh(book_to_update)
+        elif versions is not None and await self.book_exists(session, book_id):
+            raise BookVersionMismatchError()
         return book_to_update
 
+    async def book_exists(self, session: AsyncSession, book_id: uuid.UUID) -> bool:
+        query = select(Books.uid).where(Books.uid == book_id, NOT_DELETED)
+        result = await session.execute(query)
+        return result.first() is not None
+
     async def delete_book(self, session: AsyncSession, book_id: uuid.UUID) -> Book | None:
-        book_to_delete = await self.get_book_by_id(session, book_id)
+        """
+        Soft delete: stamps deleted_at and tombstones the book for the changes
+        feed. The row and its reviews are removed later by database/purge.py,
+        outside the request.
+        """
+        query = (
+            update(Books)
+            .where(Books.uid == book_id, NOT_DELETED)
+            .values(deleted_at=datetime.utcnow())
+            .returning(Books)
+        )
+        result = await session.execute(query)
+        book_to_delete = result.scalar_one_or_none()
         if book_to_delete:
-            await session.delete(book_to_delete)
+            session.add(Tombstone(kind="book", record_uid=book_to_delete.uid))
             await session.commit()
         return book_to_delete
 
@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+from typing import Dict, List
+
+from config import env_config
+from database.redis import create_bulk_mail_job, set_bulk_mail_job_status, record_bulk_mail_results
+from logger.app_logger import app_logger
+from .smtp import SMTPConnectionPool, build_html_message
+
+
+def chunked(items: List[str], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkMailService:
+    """
+    Sends one HTML email to many recipients as a background job.
+
+    Recipients are processed in chunks over a pool of BULK_MAIL_CONCURRENCY
+    reused SMTP connections, which also bounds how many sends run at once.
+    Each recipient gets their own message, so one bad address only fails
+    that recipient. Progress is kept in Redis so any API worker can report it.
+    """
+    def __init__(self) -> None:
+        # keep references so running jobs are not garbage collected
+        self._jobs: set[asyncio.Task] = set()
+
+    async def start_job(self, addresses: List[str], subject: str, html: str) -> str:
+        recipients = list(dict.fromkeys(addresses))
+        job_id = uuid.uuid4().hex
+        await create_bulk_mail_job(job_id, len(recipients))
+        task = asyncio.create_task(self._run(job_id, recipients, subject, html))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return job_id
+
+    async def _send_one(self, pool: SMTPConnectionPool, recipient: str, subject: str, html: str) -> str | None:
+        try:
+            await pool.send(build_html_message(recipient, subject, html))
+            return None
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"[:200]
+
+    async def _run(self, job_id: str, recipients: List[str], subject: str, html: str) -> None:
+        pool = SMTPConnectionPool(size=env_config.BULK_MAIL_CONCURRENCY)
+        try:
+            await set_bulk_mail_job_status(job_id, "running")
+            for chunk in chunked(recipients, env_config.BULK_MAIL_CHUNK_SIZE):
+                errors = await asyncio.gather(
+                    *(self._send_one(pool, recipient, subject, html) for recipient in chunk)
+                )
+                failures: Dict[str, str] = {
+                    recipient: error for recipient, error in zip(chunk, errors) if error
+                }
+                await record_bulk_mail_results(job_id, len(chunk) - len(failures), failures)
+            await set_bulk_mail_job_status(job_id, "completed")
+            app_logger.info(
+                f"Bulk mail job {job_id} completed: {len(recipients)} recipients, "
+                f"{pool.connections_opened} SMTP connections"
+            )
+        except Exception:
+            app_logger.exception(f"Bulk mail job {job_id} aborted")
+            try:
+                await set_bulk_mail_job_status(job_id, "aborted")
+            except Exception:
+                pass
+        finally:
+            await pool.close()
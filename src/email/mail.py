@@ -4,28 +4,42 @@ from pathlib import Path
 from typing import List
 from datetime import datetime
 
-BASE_DIR = Path(__file__).resolve().parent
-TEMPLATE_DIR = BASE_DIR / "templates"
+from .registry import TEMPLATE_DIR, template_registry
+from tracing.tracer import trace_methods
+from .smtp import SMTPConnectionPool, build_html_message
 
-mail_config = ConnectionConfig(
-    MAIL_USERNAME = env_config.MAIL_USERNAME,
-    MAIL_PASSWORD = env_config.MAIL_PASSWORD, 
-    MAIL_FROM = env_config.MAIL_FROM,
-    MAIL_PORT = env_config.MAIL_PORT,
-    MAIL_SERVER = env_config.MAIL_SERVER,
-    MAIL_FROM_NAME = env_config.MAIL_FROM_NAME,
-    MAIL_STARTTLS = env_config.MAIL_STARTTLS,
-    MAIL_SSL_TLS = env_config.MAIL_SSL_TLS,
-    USE_CREDENTIALS = env_config.USE_CREDENTIALS,
-    VALIDATE_CERTS = env_config.VALIDATE_CERTS,
-    TEMPLATE_FOLDER = TEMPLATE_DIR
-)
+def build_mail_config(**overrides) -> ConnectionConfig:
+    """
+    Build the fastapi-mail connection settings from env_config. Keyword
+    arguments override individual fields, e.g. to point at a local SMTP sink.
+    """
+    settings = dict(
+        MAIL_USERNAME = env_config.MAIL_USERNAME,
+        MAIL_PASSWORD = env_config.MAIL_PASSWORD, 
+        MAIL_FROM = env_config.MAIL_FROM,
+        MAIL_PORT = env_config.MAIL_PORT,
+        MAIL_SERVER = env_config.MAIL_SERVER,
+        MAIL_FROM_NAME = env_config.MAIL_FROM_NAME,
+        MAIL_STARTTLS = env_config.MAIL_STARTTLS,
+        MAIL_SSL_TLS = env_config.MAIL_SSL_TLS,
+        USE_CREDENTIALS = env_config.USE_CREDENTIALS,
+        VALIDATE_CERTS = env_config.VALIDATE_CERTS,
+        TEMPLATE_FOLDER = TEMPLATE_DIR
+    )
+    settings.update(overrides)
+    return ConnectionConfig(**settings)
 
 
+@trace_methods
 class EmailService:
-    """Service for sending emails using FastAPI-Mail."""
-    def __init__(self):
-        self.mail = FastMail(mail_config)
+    """
+    Service for sending emails using FastAPI-Mail. When an SMTP connection
+    pool is given, templated emails go over the pool's reused connections
+    instead of a new connection per message.
+    """
+    def __init__(self, config: ConnectionConfig | None = None, smtp_pool: SMTPConnectionPool | None = None):
+        self.mail = FastMail(config or build_mail_config())
+        self.smtp_pool = smtp_pool
     
     def create_message(self, recipients: List[str], subject: str, body: str) -> MessageSchema:
         message = MessageSchema(
@@ -40,21 +54,18 @@ class EmailService:
         self,
         email: str,
         subject: str,
-        html_template_data: str,
+        html_template_data: dict,
         html_template_name
     ):
-        template_body = {}
-        template_body["expiry_time"] = "10 minutes"
-        for k, v in html_template_data.items():
-            template_body[k] = v
+        html = template_registry.render(html_template_name, **html_template_data)
+        if self.smtp_pool is not None:
+            await self.smtp_pool.send(build_html_message(email, subject, html))
+            return
         message = MessageSchema(
             subject=subject,
             recipients=[email],
-            template_body=template_body,
+            body=html,
             subtype=MessageType.html,
         )
 
-        await self.mail.send_message(
-            message,
-            template_name=html_template_name
-        )
\ No newline at end of file
+        await self.mail.send_message(message)
\ No newline at end of file
@@ -0,0 +1,75 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, func
+from datetime import datetime, timedelta
+from typing import List
+
+from database.outbox.models import EmailOutbox
+from config import env_config
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base, 2*base, 4*base, ... capped at the configured maximum."""
+    seconds = env_config.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, env_config.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+class OutboxService:
+    """Stages emails in the outbox table and tracks their delivery state."""
+
+    def enqueue(
+        self,
+        session: AsyncSession,
+        email: str,
+        subject: str,
+        html_template_data: dict,
+        html_template_name: str
+    ) -> EmailOutbox:
+        """
+        Add an email to the session. Nothing is written until the caller commits,
+        so the email is stored if and only if the surrounding change is.
+        """
+        message = EmailOutbox(
+            recipient=email,
+            subject=subject,
+            template_name=html_template_name,
+            template_body=dict(html_template_data),
+        )
+        session.add(message)
+        return message
+
+    async def claim_batch(self, session: AsyncSession, batch_size: int) -> List[EmailOutbox]:
+        """
+        Lock up to batch_size due emails. SKIP LOCKED lets several workers drain
+        the outbox without picking the same rows.
+        """
+        query = (
+            select(EmailOutbox)
+            .where(EmailOutbox.status == "pending")
+            .where(EmailOutbox.next_attempt_at <= datetime.utcnow())
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    def mark_sent(self, message: EmailOutbox) -> None:
+        message.status = "sent"
+        message.attempts += 1
+        message.sent_at = datetime.utcnow()
+        message.last_error = None
+
+    def mark_failed(self, message: EmailOutbox, error: str) -> bool:
+        """Schedule a retry, or give up once attempts are exhausted. Returns True if it will be retried."""
+        message.attempts += 1
+        message.last_error = error[:500]
+        if message.attempts >= env_config.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            message.status = "failed"
+            return False
+        message.next_attempt_at = datetime.utcnow() + backoff_delay(message.attempts)
+        return True
+
+    async def pending_count(self, session: AsyncSession) -> int:
+        query = select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == "pending")
+        result = await session.execute(query)
+        return result.scalar_one()
@@ -0,0 +1,60 @@
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+BASE_DIR = Path(__file__).resolve().parent
+TEMPLATE_DIR = BASE_DIR / "templates"
+
+# verification and password reset links are signed with a 10 minute max_age
+LINK_EXPIRY_TIME = "10 minutes"
+
+
+class TemplateRegistry:
+    """
+    Loads and compiles every email template once.
+
+    fastapi-mail builds a new jinja Environment for each send, which re-reads
+    and recompiles the template every time. The registry keeps the compiled
+    templates and the values shared by every email (current year, link expiry)
+    as environment globals, so callers only pass per-user variables.
+    """
+    def __init__(self, template_dir: Path = TEMPLATE_DIR) -> None:
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            # unlike fastapi-mail's rendering, which does not escape: values such as
+            # user_name come from users and must not inject markup into the email
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False
+        )
+        self._templates: Dict[str, Template] = {}
+        self._year: int | None = None
+
+    def load(self) -> None:
+        for template_name in self.env.list_templates(extensions=["html"]):
+            self._templates[template_name] = self.env.get_template(template_name)
+
+    @property
+    def template_names(self) -> list[str]:
+        return sorted(self._templates)
+
+    def _refresh_static_context(self) -> None:
+        year = datetime.now().year
+        if year != self._year:
+            self.env.globals.update(
+                current_year=str(year),
+                expiry_time=LINK_EXPIRY_TIME
+            )
+            self._year = year
+
+    def render(self, template_name: str, **variables) -> str:
+        """Render a template with the per-user variables; shared values come from the globals."""
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self._templates[template_name] = self.env.get_template(template_name)
+        self._refresh_static_context()
+        return template.render(**variables)
+
+
+template_registry = TemplateRegistry()
+template_registry.load()
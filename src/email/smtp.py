@@ -0,0 +1,135 @@
+import asyncio
+from email.message import EmailMessage
+from email.utils import formataddr
+from aiosmtplib import SMTP, SMTPException, SMTPServerDisconnected
+
+from config import env_config
+
+
+def build_html_message(recipient: str, subject: str, html: str) -> EmailMessage:
+    """Build a ready-to-send HTML email from the configured sender."""
+    message = EmailMessage()
+    message["From"] = formataddr((env_config.MAIL_FROM_NAME, env_config.MAIL_FROM))
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(html, subtype="html")
+    return message
+
+
+class SMTPConnectionPool:
+    """
+    A small pool of long-lived SMTP connections.
+
+    fastapi-mail opens, authenticates and closes a connection for every message.
+    The pool keeps up to `size` authenticated connections open and reuses them,
+    reconnecting transparently when the server has dropped an idle one.
+    """
+    def __init__(
+        self,
+        size: int = 1,
+        hostname: str | None = None,
+        port: int | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool | None = None,
+        start_tls: bool | None = None,
+        validate_certs: bool | None = None,
+        use_credentials: bool | None = None,
+        timeout: float = 30,
+    ) -> None:
+        self.size = size
+        self.hostname = hostname or env_config.MAIL_SERVER
+        self.port = port or env_config.MAIL_PORT
+        if use_credentials is None:
+            use_credentials = env_config.USE_CREDENTIALS
+        self.username = (username or env_config.MAIL_USERNAME) if use_credentials else None
+        self.password = (password or env_config.MAIL_PASSWORD) if use_credentials else None
+        self.use_tls = env_config.MAIL_SSL_TLS if use_tls is None else use_tls
+        self.start_tls = env_config.MAIL_STARTTLS if start_tls is None else start_tls
+        self.validate_certs = env_config.VALIDATE_CERTS if validate_certs is None else validate_certs
+        self.timeout = timeout
+
+        self._idle: asyncio.Queue[SMTP] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+        self._connections: list[SMTP] = []
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    async def _connect(self) -> SMTP:
+        connection = SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+        try:
+            await connection.connect()
+        except BaseException:
+            connection.close()
+            raise
+        self.connections_opened += 1
+        return connection
+
+    async def _acquire(self) -> SMTP:
+        await self._slots.acquire()
+        try:
+            if not self._idle.empty():
+                connection = self._idle.get_nowait()
+                if connection.is_connected:
+                    return connection
+                self._connections.remove(connection)
+            connection = await self._connect()
+            self._connections.append(connection)
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: SMTP, healthy: bool) -> None:
+        if healthy and connection.is_connected:
+            self._idle.put_nowait(connection)
+        else:
+            connection.close()
+            self._connections.remove(connection)
+        self._slots.release()
+
+    async def send(self, message: EmailMessage) -> None:
+        """Send one message, retrying once on a fresh connection if the server hung up."""
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                await connection.send_message(message)
+            except SMTPServerDisconnected:
+                self._release(connection, healthy=False)
+                if attempt:
+                    raise
+                continue
+            except SMTPException:
+                # the connection may be mid-transaction; reset it before reuse
+                try:
+                    await connection.rset()
+                    healthy = True
+                except SMTPException:
+                    healthy = False
+                self._release(connection, healthy=healthy)
+                raise
+            except BaseException:
+                self._release(connection, healthy=False)
+                raise
+            self._release(connection, healthy=True)
+            self.messages_sent += 1
+            return
+
+    async def close(self) -> None:
+        for connection in list(self._connections):
+            try:
+                if connection.is_connected:
+                    await connection.quit()
+            except SMTPException:
+                connection.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
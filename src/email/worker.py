@@ -0,0 +1,107 @@
+"""
+Email outbox worker.
+
+Drains the email_outbox table in batches and sends over a small pool of
+long-lived SMTP connections. Run it next to the API:
+
+    python -m src.email.worker
+
+Delivery is at-least-once: a crash between handing a message to the SMTP
+server and committing the batch sends that message again on the next run.
+"""
+import asyncio
+import signal
+import time
+from prometheus_client import start_http_server
+
+from config import env_config
+from database.main import engine, async_session_factory
+from database.outbox.models import EmailOutbox
+from logger.app_logger import app_logger
+from metrics.app_metrics import EMAIL_OUTBOX_DEPTH, EMAIL_SEND_SECONDS, EMAIL_SEND_TOTAL, metrics_registry
+from .mail import EmailService
+from .outbox import OutboxService
+from .smtp import SMTPConnectionPool
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        session_factory,
+        smtp_pool: SMTPConnectionPool,
+        batch_size: int = env_config.EMAIL_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = env_config.EMAIL_OUTBOX_POLL_SECONDS
+    ) -> None:
+        self.session_factory = session_factory
+        self.smtp_pool = smtp_pool
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.outbox = OutboxService()
+        self.email_service = EmailService(smtp_pool=smtp_pool)
+
+    async def _send(self, message: EmailOutbox) -> None:
+        start = time.perf_counter()
+        try:
+            await self.email_service.send_html_mail_to_user_email(
+                email=message.recipient,
+                subject=message.subject,
+                html_template_data=message.template_body,
+                html_template_name=message.template_name
+            )
+        except Exception as e:
+            will_retry = self.outbox.mark_failed(message, f"{type(e).__name__}: {e}")
+            EMAIL_SEND_TOTAL.labels(result="retry" if will_retry else "failed").inc()
+            app_logger.warning(
+                f"Outbox email {message.uid} to {message.recipient} failed "
+                f"(attempt {message.attempts}): {e}"
+            )
+            return
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - start)
+        EMAIL_SEND_TOTAL.labels(result="sent").inc()
+        self.outbox.mark_sent(message)
+
+    async def drain_once(self) -> int:
+        """Send one batch of due emails and return how many were attempted."""
+        async with self.session_factory() as session:
+            messages = await self.outbox.claim_batch(session, self.batch_size)
+            # the rows stay locked until commit; sends share the SMTP pool
+            await asyncio.gather(*(self._send(message) for message in messages))
+            await session.commit()
+            EMAIL_OUTBOX_DEPTH.set(await self.outbox.pending_count(session))
+        return len(messages)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        app_logger.info("Email outbox worker started")
+        while not stop.is_set():
+            try:
+                attempted = await self.drain_once()
+            except Exception:
+                app_logger.exception("Email outbox worker failed to drain a batch")
+                attempted = 0
+            if attempted < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        await self.smtp_pool.close()
+        app_logger.info("Email outbox worker stopped")
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    if env_config.EMAIL_WORKER_METRICS_PORT:
+        start_http_server(env_config.EMAIL_WORKER_METRICS_PORT, registry=metrics_registry())
+
+    worker = OutboxWorker(
+        async_session_factory,
+        SMTPConnectionPool(size=env_config.EMAIL_SMTP_POOL_SIZE)
+    )
+    await worker.run(stop)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
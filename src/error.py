@@ -49,6 +49,10 @@ class BookNotFoundError(BooklyException):
     pass
 
 
+class BookVersionMismatchError(BooklyException):
+    """Exception raised when a book was changed since the version an update is based on."""
+    pass
+
 class BookAlreadyExistsError(BooklyException):
     """Exception raised when attempting to create a book that already exists."""
     pass
@@ -74,6 +78,14 @@ class FailedInResettingPasswordError(BooklyException):
     """Exception raised when password resetting fails."""
     pass
 
+class BulkMailJobNotFoundError(BooklyException):
+    """Exception raised when a bulk mail job is unknown or has expired."""
+    pass
+
+class InvalidSyncCursorError(BooklyException):
+    """Exception raised when a changes feed cursor cannot be decoded."""
+    pass
+
 def create_exception_handler(status_code: int, detail: Any) -> Callable[[Request, Exception],JSONResponse]:
     async def exception_handler(request: Request, exc: Exception) -> JSONResponse:
         return JSONResponse(
@@ -140,6 +152,17 @@ def register_all_errors(app: FastAPI):
             }
         )
     )
+    app.add_exception_handler(
+        BookNotFoundError,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Book not found.",
+                "error_code": "BOOK_NOT_FOUND",
+                "resolution": "Please check the book id and try again."
+            }
+        )
+    )
     app.add_exception_handler(
         InsufficientPermissionsError, 
         create_exception_handler(
@@ -198,6 +221,42 @@ def register_all_errors(app: FastAPI):
         )
     )
 
+    app.add_exception_handler(
+        BulkMailJobNotFoundError,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Bulk mail job not found.",
+                "error_code": "BULK_MAIL_JOB_NOT_FOUND",
+                "resolution": "Please check the job id. Job status is kept for 24 hours."
+            }
+        )
+    )
+
+    app.add_exception_handler(
+        BookVersionMismatchError,
+        create_exception_handler(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail={
+                "message": "Book was changed by someone else.",
+                "error_code": "BOOK_VERSION_MISMATCH",
+                "resolution": "Fetch the book again and reapply your changes to its current version."
+            }
+        )
+    )
+
+    app.add_exception_handler(
+        InvalidSyncCursorError,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid sync cursor.",
+                "error_code": "INVALID_SYNC_CURSOR",
+                "resolution": "Pass the cursor from the previous response unchanged, or omit it to sync from the start."
+            }
+        )
+    )
+
 
 def register_internal_server_error_handler(app: FastAPI) -> None:
     @app.exception_handler(Exception)
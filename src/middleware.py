@@ -4,43 +4,280 @@ from fastapi.requests import Request
 import time
 from fastapi.middleware.cors import CORSMiddleware 
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.routing import APIRoute
+from typing import Callable, Dict, Iterable, Set
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from config import env_config
+from database.query_stats import QueryStats, current_query_stats
 from logger.app_logger import app_logger
 from logger.user_logger import get_user_logger
+from tracing.tracer import tracer
+from metrics.app_metrics import HTTP_REQUESTS_IN_PROGRESS, HTTP_REQUESTS_TOTAL, HTTP_REQUEST_SECONDS
 
 
-EXCLUDED_PATHS = ["/test","/auth/login","/auth/register", "verify-email", "/auth/refresh-token"]
+PUBLIC_ROUTE_ATTR = "__public_route__"
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
 
-        client = request.client
-        client_info = f"{client.host}:{client.port}" if client else "unknown"
+def public_route(endpoint: Callable) -> Callable:
+    """Mark a route handler as reachable without an Authorization header."""
+    setattr(endpoint, PUBLIC_ROUTE_ATTR, True)
+    return endpoint
+
+
+class PublicRouteTrie:
+    """
+    Public route templates keyed one path segment per level. A "{param}"
+    segment matches any single value, so a lookup visits one node per segment
+    of the request path instead of scanning a list of substrings.
+    """
+    WILDCARD = "{}"
+
+    def __init__(self) -> None:
+        self.root: Dict = {}
+
+    @staticmethod
+    def _segments(path: str) -> list[str]:
+        return path.strip("/").split("/")
+
+    def add(self, path: str, methods: Iterable[str]) -> None:
+        node = self.root
+        for segment in self._segments(path):
+            key = self.WILDCARD if segment.startswith("{") else segment
+            node = node.setdefault(key, {})
+        # the None key holds the methods that are public at this exact path
+        allowed: Set[str] = node.setdefault(None, set())
+        allowed.update(methods)
+        if "GET" in allowed:
+            allowed.add("HEAD")
+
+    def match(self, path: str, method: str) -> bool:
+        return self._match(self.root, self._segments(path), 0, method)
+
+    def _match(self, node: Dict, segments: list[str], index: int, method: str) -> bool:
+        if index == len(segments):
+            return method in node.get(None, ())
+        for key in (segments[index], self.WILDCARD):
+            child = node.get(key)
+            if child is not None and self._match(child, segments, index + 1, method):
+                return True
+        return False
+
+
+def compile_public_routes(app: FastAPI) -> PublicRouteTrie:
+    public_routes = PublicRouteTrie()
+    for route in app.routes:
+        if isinstance(route, APIRoute) and getattr(route.endpoint, PUBLIC_ROUTE_ATTR, False):
+            public_routes.add(route.path, route.methods)
+    # interactive docs and the schema they load
+    for url in (app.docs_url, app.redoc_url, app.openapi_url, app.swagger_ui_oauth2_redirect_url):
+        if url:
+            public_routes.add(url, {"GET"})
+    return public_routes
+
+
+class AuthenticationMiddleware:
+    """
+    Rejects requests that carry no Authorization header, unless their route is
+    marked with @public_route. Validating the token is left to the route
+    dependencies.
+
+    Starlette builds the middleware stack on the first call (the lifespan
+    startup under uvicorn), after every router has been included, so the
+    public routes are compiled exactly once here.
+    """
+    def __init__(self, app: ASGIApp, api: FastAPI) -> None:
+        self.app = app
+        self.public_routes = compile_public_routes(api)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.public_routes.match(scope["path"], scope["method"]):
+            await self.app(scope, receive, send)
+            return
+        if not any(name == b"authorization" and value for name, value in scope["headers"]):
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={
+                    "message": "Not Authenticated",
+                    "resolution": "Please provide valid authentication credentials."
+                }
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+class LoggingMiddleware:
+    """
+    Logs method, path, status and duration of every HTTP request.
+
+    Plain ASGI rather than BaseHTTPMiddleware: it only wraps send to read the
+    status code, so no extra task or memory stream is created per request and
+    streaming responses pass through unbuffered. The duration runs until the
+    last body chunk has been sent.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.log_request(scope, status_code, time.perf_counter() - start_time)
+
+    @staticmethod
+    def log_request(scope: Scope, status_code: int, process_time: float) -> None:
+        client = scope.get("client")
+        client_info = f"{client[0]}:{client[1]}" if client else "unknown"
 
         message = (
             f"{client_info} | "
-            f"{request.method} | "
-            f"{request.url.path} | "
-            f"{response.status_code} | "
+            f"{scope['method']} | "
+            f"{scope['path']} | "
+            f"{status_code} | "
             f"{process_time:.4f}s"
         )
 
         app_logger.info(message)
 
-        user = getattr(request.state, "user", None)
+        user = scope.get("state", {}).get("user")
         if user:
             user_logger = get_user_logger(user.username)
             user_logger.info(
-                f"{request.method} {request.url.path} "
-                f"-> {response.status_code} "
+                f"{scope['method']} {scope['path']} "
+                f"-> {status_code} "
                 f"in {process_time:.4f}s"
             )
 
-        return response
+
+class MetricsMiddleware:
+    """
+    Records request counts, latency and in-flight requests for Prometheus.
+
+    Requests are labelled with the matched route template ("/books/{book_id}")
+    that FastAPI leaves in scope["route"], never with the raw path, so the
+    number of series stays bounded. Requests that match no route, including
+    those rejected before routing, share the "unmatched" label.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start_time
+            in_progress.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS_TOTAL.labels(method=method, route=template, status=str(status_code)).inc()
+            HTTP_REQUEST_SECONDS.labels(method=method, route=template).observe(process_time)
+
+
+class QueryTimingMiddleware:
+    """
+    Counts the SQL statements of each request and the time spent in them.
+
+    The totals are reported to the client as
+    `Server-Timing: db;dur=<ms>;desc="<n> queries"`, and requests above
+    SLOW_REQUEST_QUERY_COUNT queries or SLOW_REQUEST_SECONDS are logged.
+    The header is sent with the response start, so only the log line covers
+    queries made while a streaming body is being sent.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        token = current_query_stats.set(stats)
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                server_timing = f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            process_time = time.perf_counter() - start_time
+            if stats.count > env_config.SLOW_REQUEST_QUERY_COUNT or process_time > env_config.SLOW_REQUEST_SECONDS:
+                app_logger.warning(
+                    f"Slow request | {scope['method']} | {scope['path']} | "
+                    f"{stats.count} queries | db {stats.seconds:.4f}s | total {process_time:.4f}s"
+                )
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of each sampled request (see tracing.tracer). The span
+    is named after the matched route template and the trace id is returned
+    in an X-Trace-Id header, so a slow response can be found in the exports.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with tracer.start_trace(scope["method"], traceparent, path=scope["path"]) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["status_code"] = message["status"]
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                span.name = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
 
 
 def register_middleware(app: FastAPI):
@@ -60,28 +297,22 @@ def register_middleware(app: FastAPI):
         return response
     """
 
-    @app.middleware("http")
-    async def authentication_middleware(request: Request, call_next):
-        if "/test" in request.url.path:
-            return await call_next(request)
-        if any(p in request.url.path for p in EXCLUDED_PATHS):
-            return await call_next(request)
-        if any(p in request.url.path for p in ["/test","/docs", "/redoc", "/openapi.json"]):
-            return await call_next(request)
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                content={
-                    "message": "Not Authenticated",
-                    "resolution": "Please provide valid authentication credentials."
-                }
-            )
-        response = await call_next(request)
-        return response
+    app.add_middleware(
+        AuthenticationMiddleware,
+        api=app
+    )
+    app.add_middleware(
+        QueryTimingMiddleware
+    )
     app.add_middleware(
         LoggingMiddleware
     )
+    app.add_middleware(
+        MetricsMiddleware
+    )
+    app.add_middleware(
+        TracingMiddleware
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -11,10 +11,12 @@ from database.reviews.schema import ReviewCreateModel, ReviewUpdateModel, Review
 from src.auth.service import AuthService
 from src.books.service import BookService
 from src.error import UserNotFoundError, BookNotFoundError
+from tracing.tracer import trace_methods
 
 user_service = AuthService()
 book_service = BookService()
 
+@trace_methods
 class ReviewService:
 
     async def add_review(self, user_email: str, 
@@ -23,17 +25,17 @@ class ReviewService:
                          session: AsyncSession
         ) -> ReviewModel:
         try:
-            user = await user_service.get_user_by_email(session=session, email=user_email)
+            user = await user_service.get_user_auth_claims(session=session, email=user_email)
             if not user:
                 raise UserNotFoundError()
 
-            book = await book_service.get_book_by_id(session=session, book_id=book_id)
-            if not book:
+            # an existence check only: loading the book would load all of its reviews
+            if not await book_service.book_exists(session, book_id):
                 raise BookNotFoundError()
             review_data_dict = review_data.model_dump()
             new_review = Reviews(**review_data_dict)
-            new_review.user = user
-            new_review.book = book
+            new_review.user_uid = user.uid
+            new_review.book_uid = book_id
             session.add(new_review)
             await session.commit()
             await session.refresh(new_review)
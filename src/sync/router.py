@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import env_config
+from database.main import get_session
+from database.sync.schema import SyncChangesModel
+from .service import SyncService
+from src.auth.dependencies import RoleChecker, access_token_bearer
+
+sync_router = APIRouter()
+sync_service = SyncService()
+role_checker = Depends(RoleChecker(allowed_roles=["admin", "user"]))
+
+# reads the primary: a lagging replica could hide changes older than the cursor it hands out
+@sync_router.get("/changes", response_model=SyncChangesModel, dependencies=[role_checker])
+async def get_changes(
+    cursor: str | None = None,
+    limit: int = Query(default=env_config.SYNC_PAGE_SIZE, ge=1, le=env_config.SYNC_MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer)) -> dict:
+    return await sync_service.get_changes(session, cursor, limit)
@@ -0,0 +1,85 @@
+from sqlalchemy import exists, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select
+from typing import Dict, Tuple
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from config import env_config
+from database.auth.models import User
+from database.books.models import Books
+from database.reviews.models import Reviews
+from database.sync.models import Tombstone
+from src.error import InvalidSyncCursorError
+from tracing.tracer import trace_methods
+
+# feed section -> model, the column it is ordered by and extra filters; each
+# is read by its (column, uid) index. Soft-deleted books are reported through
+# the tombstone written by delete_book; reviews of a soft-deleted book or user
+# are held back until the purge removes them and tombstones them.
+STREAMS = {
+    "books": (Books, Books.updated_at, (Books.deleted_at.is_(None),)),
+    "reviews": (Reviews, Reviews.updated_at, (
+        ~exists().where(Books.uid == Reviews.book_uid, Books.deleted_at.is_not(None)),
+        ~exists().where(User.uid == Reviews.user_uid, User.deleted_at.is_not(None)),
+    )),
+    "deleted": (Tombstone, Tombstone.deleted_at, ()),
+}
+
+Positions = Dict[str, Tuple[datetime, uuid.UUID]]
+
+
+def encode_cursor(positions: Positions) -> str:
+    data = {name: [changed_at.isoformat(), str(uid)] for name, (changed_at, uid) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> Positions:
+    """The last (timestamp, uid) served per section; empty for a first sync."""
+    if not cursor:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {
+            name: (datetime.fromisoformat(data[name][0]), uuid.UUID(data[name][1]))
+            for name in STREAMS if name in data
+        }
+    except (ValueError, TypeError, KeyError, IndexError) as e:
+        raise InvalidSyncCursorError() from e
+
+
+@trace_methods
+class SyncService:
+    async def get_changes(self, session: AsyncSession, cursor: str | None, limit: int) -> dict:
+        """
+        Books and reviews created or updated, and tombstones of deletes,
+        after `cursor`, oldest first and at most `limit` of each. Clients
+        call again with the returned cursor while has_more is true.
+
+        Only changes older than SYNC_SETTLE_SECONDS are served. A write
+        transaction stamps updated_at before it commits; without the delay a
+        client could move its cursor past a change that becomes visible
+        later.
+        """
+        positions = decode_cursor(cursor)
+        horizon = datetime.utcnow() - timedelta(seconds=env_config.SYNC_SETTLE_SECONDS)
+        changes = {}
+        has_more = False
+        for name, (model, changed_at, criteria) in STREAMS.items():
+            query = (
+                select(model)
+                .where(changed_at < horizon, *criteria)
+                .order_by(changed_at, model.uid)
+                .limit(limit + 1)
+            )
+            if name in positions:
+                query = query.where(tuple_(changed_at, model.uid) > tuple_(*positions[name]))
+            rows = (await session.execute(query)).scalars().all()
+            has_more = has_more or len(rows) > limit
+            rows = rows[:limit]
+            if rows:
+                positions[name] = (getattr(rows[-1], changed_at.key), rows[-1].uid)
+            changes[name] = rows
+        return {**changes, "cursor": encode_cursor(positions), "has_more": has_more}
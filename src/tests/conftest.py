@@ -1,11 +1,21 @@
 from fastapi.testclient import TestClient
 from unittest.mock import Mock
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+import asyncio
+import os
 import pytest
 
-from database.main import get_session
+from database.main import get_session, RoutingAsyncSession
+from database.replicas import RoutingSession
 from src.auth.dependencies import RoleChecker, AccessTokenBearer, RefreshTokenBearer
 
 from main import app
+from .query_budget import QueryRecorder
+import src.auth.dependencies
+import src.auth.router
 
 mock_session = Mock()
 mock_user_service = Mock()
@@ -38,3 +48,55 @@ def fake_book_service():
 def test_client():
     return TestClient(app)
 
+# query budget tests need a real database; point this at a scratch one, it is reset per test
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+@pytest.fixture
+def db_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    # NullPool: the test client and asyncio.run() use different event loops
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+
+    async def reset_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(reset_tables())
+    yield engine
+    asyncio.run(engine.dispose())
+
+@pytest.fixture
+def db_client(db_engine, monkeypatch):
+    Session = sessionmaker(
+        bind=db_engine,
+        class_=RoutingAsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False
+    )
+
+    async def get_test_session():
+        async with Session() as session:
+            yield session
+
+    # the token blocklist lives in Redis; keep it in memory for these tests
+    blocklist = set()
+
+    async def add_jti_to_blocklist(jti: str) -> None:
+        blocklist.add(jti)
+
+    async def is_jti_in_blocklist(jti: str) -> bool:
+        return jti in blocklist
+
+    monkeypatch.setattr(src.auth.router, "add_jti_to_blocklist", add_jti_to_blocklist)
+    monkeypatch.setattr(src.auth.dependencies, "is_jti_in_blocklist", is_jti_in_blocklist)
+    app.dependency_overrides[get_session] = get_test_session
+    yield TestClient(app, base_url="http://localhost")
+    app.dependency_overrides[get_session] = get_mock_session
+
+@pytest.fixture
+def query_recorder(db_engine):
+    recorder = QueryRecorder(db_engine)
+    yield recorder
+    recorder.close()
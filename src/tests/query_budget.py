@@ -0,0 +1,53 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# "IN ($1::UUID, $2::UUID, ...)" -> "IN (?)", then any remaining "$n" -> "?"
+PARAMETER_LIST = re.compile(r"\(\s*\$\d+(?:::\w+)?(?:\s*,\s*\$\d+(?:::\w+)?)*\s*\)")
+PARAMETER = re.compile(r"\$\d+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace and bound parameters normalized, so repeats compare equal."""
+    shape = " ".join(statement.split())
+    shape = PARAMETER_LIST.sub("(?)", shape)
+    return PARAMETER.sub("?", shape)
+
+
+class QueryRecorder:
+    """
+    Records every statement an engine executes. query_budget() checks the
+    statements issued inside its block: more than max_queries, or the same
+    statement shape more than max_repeats times (the usual sign of a lazy
+    load per row), fails the test and lists what ran.
+    """
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.statements: List[str] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def close(self) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._record)
+
+    @contextmanager
+    def query_budget(self, max_queries: int, max_repeats: int = 2):
+        start = len(self.statements)
+        yield
+        statements = self.statements[start:]
+        problems = []
+        if len(statements) > max_queries:
+            problems.append(f"{len(statements)} queries, budget is {max_queries}")
+        for shape, count in Counter(map(statement_shape, statements)).items():
+            if count > max_repeats:
+                problems.append(f"same statement {count} times, limit is {max_repeats}: {shape[:200]}")
+        if problems:
+            listing = "\n".join(f"  {i}. {' '.join(s.split())[:160]}" for i, s in enumerate(statements, 1))
+            pytest.fail("\n".join(problems) + "\nstatements:\n" + listing, pytrace=False)
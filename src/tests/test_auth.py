@@ -1,4 +1,16 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import pytest
+
 from database.auth.schema import UserCreateModel
+from database.outbox.models import EmailOutbox
+from src.auth.service import AuthService
+from src.email.outbox import OutboxService
+from src.error import UserAlreadyExistsError, UsernameAlreadyTakenError
+import src.auth.dependencies
+
+from .test_query_budgets import add_book_with_reviews, api_prefix, book_data, signed_up_user
 
 auth_prefix = "/api/vi/auth"
 
@@ -20,3 +32,57 @@ def test_user_creation(fake_session, fake_user_service, test_client):
     assert fake_user_service.register_user_called_once()
     assert fake_user_service.register_user_called_once(user_data, fake_session)
 
+
+
+def register(db_engine, email: str, username: str) -> None:
+    """Stage the verification email and register, in one session, as the /register route does."""
+    async def run():
+        async with AsyncSession(db_engine, expire_on_commit=False) as session:
+            OutboxService().enqueue(session, email, "Verify your Bookly account", {"user_name": username}, "verify_account.html")
+            await AuthService().register_user(UserCreateModel(
+                email=email, username=username, password="pw123456", first_name="Bookly", last_name="Reader"
+            ), session)
+    asyncio.run(run())
+
+
+def queued_recipients(db_engine) -> list:
+    async def fetch():
+        async with AsyncSession(db_engine) as session:
+            return list((await session.execute(select(EmailOutbox.recipient))).scalars())
+    return asyncio.run(fetch())
+
+
+@pytest.mark.parametrize("email, username, error", [
+    ("reader@bookly.example", "other", UserAlreadyExistsError),
+    ("other@bookly.example", "reader", UsernameAlreadyTakenError),
+])
+def test_register_conflicts_roll_back_the_queued_email(db_engine, email, username, error):
+    register(db_engine, "reader@bookly.example", "reader")
+
+    with pytest.raises(error):
+        register(db_engine, email, username)
+
+    assert queued_recipients(db_engine) == ["reader@bookly.example"]
+
+
+def test_token_is_checked_once_per_request(db_client, monkeypatch):
+    headers = signed_up_user(db_client)
+    book_id = add_book_with_reviews(db_client, headers)
+    in_blocklist = src.auth.dependencies.is_jti_in_blocklist
+    lookups = []
+
+    async def counting_is_jti_in_blocklist(jti: str) -> bool:
+        lookups.append(jti)
+        return await in_blocklist(jti)
+
+    monkeypatch.setattr(src.auth.dependencies, "is_jti_in_blocklist", counting_is_jti_in_blocklist)
+    # read routes (role checker, read session and route all need the token) and a write route
+    for method, path, body in (
+        ("GET", "/auth/me", None),
+        ("GET", f"/books/{book_id}", None),
+        ("GET", "/books/", None),
+        ("PATCH", f"/books/{book_id}", book_data),
+    ):
+        lookups.clear()
+        assert db_client.request(method, f"{api_prefix}{path}", json=body, headers=headers).status_code == 200
+        assert len(lookups) == 1, path
@@ -0,0 +1,41 @@
+import uuid
+
+from .test_query_budgets import add_book_with_reviews, api_prefix, book_data, signed_up_user
+
+
+def test_stale_book_updates_are_rejected(db_client):
+    headers = signed_up_user(db_client)
+    book_id = add_book_with_reviews(db_client, headers, reviews=1)
+    url = f"{api_prefix}/books/{book_id}"
+    etag = db_client.get(url, headers=headers).headers["ETag"]
+    assert etag == '"1"'
+
+    response = db_client.patch(url, json={**book_data, "title": "First"}, headers={**headers, "If-Match": etag})
+    assert response.json()["version"] == 2 and response.json()["reviews"]
+    assert response.headers["ETag"] == '"2"'
+
+    # a second editor still holding version 1, by header or in the body
+    for stale in ({"If-Match": etag}, {"If-Match": 'W/"2"'}, {"If-Match": '"3", "4"'}, {"If-Match": "2"}):
+        response = db_client.patch(url, json={**book_data, "title": "Second"}, headers={**headers, **stale})
+        assert response.status_code == 412
+        assert response.json()["detail"]["error_code"] == "BOOK_VERSION_MISMATCH"
+    response = db_client.patch(url, json={**book_data, "title": "Second", "version": 1}, headers=headers)
+    assert response.status_code == 412
+    assert db_client.get(url, headers=headers).json()["title"] == "First"
+
+    # any tag in a list may match
+    response = db_client.patch(url, json={**book_data, "title": "Second"}, headers={**headers, "If-Match": 'W/"2", "2"'})
+    assert response.json()["title"] == "Second"
+    response = db_client.patch(url, json={**book_data, "title": "Second", "version": 3}, headers=headers)
+    assert response.json()["version"] == 4
+    # no precondition: last write wins, as before
+    assert db_client.patch(url, json={**book_data, "title": "Third"}, headers=headers).json()["version"] == 5
+
+    # a precondition on a book that is gone, or never existed, is a 404 and not a 412
+    assert db_client.delete(url, headers=headers).status_code == 200
+    for missing_url in (url, f"{api_prefix}/books/{uuid.uuid4()}"):
+        # weak and malformed tags can never match, but the missing book is reported first
+        for if_match in ('"1"', 'W/"1"', "1"):
+            response = db_client.patch(missing_url, json={**book_data, "title": "Gone"}, headers={**headers, "If-Match": if_match})
+            assert response.status_code == 404
+            assert response.json()["detail"]["error_code"] == "BOOK_NOT_FOUND"
@@ -0,0 +1,113 @@
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import text
+import asyncio
+import time
+import pytest
+
+from benchmarks.email_pipeline import SinkHandler, start_sink
+from config import env_config
+from main import warmup
+import database.redis
+
+from .test_query_budgets import api_prefix, signed_up_user
+
+BOUNCING = "bounce@bookly.example"
+
+
+class BouncingHandler(SinkHandler):
+    """Accepts every recipient except BOUNCING."""
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options) -> str:
+        if address == BOUNCING:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+
+@pytest.fixture
+def bulk_mail_store(monkeypatch):
+    store = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(database.redis, "bulk_mail_store", store)
+    return store
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    sink = start_sink()
+    sink.handler = BouncingHandler()
+    monkeypatch.setattr(env_config, "MAIL_SERVER", sink.hostname)
+    monkeypatch.setattr(env_config, "MAIL_PORT", sink.port)
+    monkeypatch.setattr(env_config, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(env_config, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(env_config, "USE_CREDENTIALS", False)
+    yield sink
+    sink.stop()
+
+
+def make_admin(db_engine, username: str) -> None:
+    async def promote():
+        async with db_engine.begin() as conn:
+            await conn.execute(text("UPDATE users SET role = 'admin' WHERE username = :username"), {"username": username})
+    asyncio.run(promote())
+
+
+def wait_for_job(client, status_url: str, headers: dict, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(status_url, headers=headers).json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_bulk_mail_job_reports_sent_and_failed_recipients(db_engine, db_client, bulk_mail_store, smtp_sink, monkeypatch):
+    async def skip_warmup() -> None:
+        pass
+
+    monkeypatch.setattr(warmup, "run", skip_warmup)
+    monkeypatch.setattr(warmup, "seconds", 0.0)
+    monkeypatch.setattr(env_config, "BULK_MAIL_CHUNK_SIZE", 2)
+    headers = signed_up_user(db_client, username="admin")
+    make_admin(db_engine, "admin")
+    addresses = [f"reader{n}@bookly.example" for n in range(4)] + [BOUNCING, "reader0@bookly.example"]
+
+    # the job runs as a task on the client's event loop, which only outlives a request inside `with`
+    with db_client:
+        response = db_client.post(f"{api_prefix}/auth/send-mail", json={"addresses": addresses}, headers=headers)
+        assert response.status_code == 202
+        job = wait_for_job(db_client, response.json()["status_url"], headers)
+
+    # duplicates are sent once; the bounce only fails its own recipient
+    assert (job["status"], job["total"], job["sent"], job["failed"]) == ("completed", 5, 4, 1)
+    assert list(job["failures"]) == [BOUNCING] and "550" in job["failures"][BOUNCING]
+    assert smtp_sink.handler.messages == 4
+    # three chunks of at most two recipients over BULK_MAIL_CONCURRENCY connections
+    assert smtp_sink.handler.connections <= env_config.BULK_MAIL_CONCURRENCY
+
+
+def test_bulk_mail_status_is_admin_only_and_404s_unknown_jobs(db_engine, db_client, bulk_mail_store):
+    headers = signed_up_user(db_client)
+    response = db_client.post(f"{api_prefix}/auth/send-mail", json={"addresses": ["reader@bookly.example"]}, headers=headers)
+    assert response.status_code == 403
+    assert db_client.get(f"{api_prefix}/auth/send-mail/unknown", headers=headers).status_code == 403
+
+    make_admin(db_engine, "reader")
+    response = db_client.get(f"{api_prefix}/auth/send-mail/unknown", headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"]["error_code"] == "BULK_MAIL_JOB_NOT_FOUND"
+
+
+def test_orphaned_bulk_mail_job_reports_stale(bulk_mail_store, monkeypatch):
+    monkeypatch.setattr(env_config, "BULK_MAIL_STALE_SECONDS", 60)
+
+    async def orphan_job() -> tuple:
+        await database.redis.create_bulk_mail_job("orphan", 10)
+        await database.redis.set_bulk_mail_job_status("orphan", "running")
+        await database.redis.record_bulk_mail_results("orphan", 2, {})
+        fresh = await database.redis.get_bulk_mail_job("orphan")
+        # the process running it restarted a while ago
+        await bulk_mail_store.hset("bulk_mail:orphan", "updated_at", time.time() - 61)
+        return fresh, await database.redis.get_bulk_mail_job("orphan")
+
+    fresh, orphaned = asyncio.run(orphan_job())
+    assert (fresh["status"], fresh["sent"]) == ("running", 2)
+    assert (orphaned["status"], orphaned["sent"]) == ("stale", 2)
@@ -0,0 +1,17 @@
+from benchmarks.email_pipeline import run_pipeline
+import asyncio
+
+
+def test_email_pipeline_delivers_every_flow_email():
+    results = asyncio.run(run_pipeline(users=5, concurrency=2))
+
+    for result in results.values():
+        assert result.messages == 20
+        assert result.delivered == 20
+
+
+def test_pooled_transport_reuses_smtp_connections():
+    results = asyncio.run(run_pipeline(users=5, concurrency=2))
+
+    assert results["fastapi-mail"].connections == 20
+    assert results["pooled"].connections <= 2
@@ -0,0 +1,10 @@
+from database.ids import uuid7
+
+
+def test_uuid7_keys_are_version_7_and_strictly_increasing():
+    keys = [uuid7() for _ in range(10000)]
+
+    assert {key.version for key in keys} == {7}
+    assert all(earlier < later for earlier, later in zip(keys, keys[1:]))
+    # uuid ordering is byte ordering, the same as Postgres' uuid btree
+    assert sorted(keys, key=lambda key: key.bytes) == keys
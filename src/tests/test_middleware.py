@@ -0,0 +1,79 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+import re
+
+from config import env_config
+from database.query_stats import track_query_stats
+from metrics.app_metrics import render_metrics
+from src.middleware import PublicRouteTrie, QueryTimingMiddleware, compile_public_routes
+import src.middleware
+
+from main import app
+
+
+def test_public_route_trie_matches_whole_segments():
+    public_routes = PublicRouteTrie()
+    public_routes.add("/test", {"GET"})
+    public_routes.add("/api/v1/auth/verify/{token}", {"GET"})
+
+    assert public_routes.match("/test", "GET")
+    assert public_routes.match("/test", "HEAD")
+    assert public_routes.match("/api/v1/auth/verify/abc.def", "GET")
+    assert not public_routes.match("/test", "POST")
+    assert not public_routes.match("/testing", "GET")
+    assert not public_routes.match("/api/v1/books/test", "GET")
+    assert not public_routes.match("/api/v1/auth/verify/abc/extra", "GET")
+
+
+def test_only_marked_routes_are_public():
+    public_routes = compile_public_routes(app)
+
+    assert public_routes.match("/api/v1/auth/login", "POST")
+    assert public_routes.match("/api/v1/docs", "GET")
+    assert not public_routes.match("/api/v1/auth/me", "GET")
+    assert not public_routes.match("/api/v1/books/", "GET")
+
+
+def test_requests_are_counted_by_route_template():
+    client = TestClient(app, base_url="http://localhost")
+    client.get("/test")
+
+    assert client.get("/metrics").status_code == 401
+    content, _ = render_metrics()
+    assert b'bookly_http_requests_total{method="GET",route="/test",status="200"}' in content
+
+
+def test_query_timing_reports_queries_and_logs_slow_requests(db_engine, monkeypatch):
+    track_query_stats(db_engine)
+    timed_app = FastAPI()
+    timed_app.add_middleware(QueryTimingMiddleware)
+
+    @timed_app.get("/queries")
+    async def three_queries():
+        async with db_engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT pg_sleep(0.01)"))
+        return {}
+
+    warnings = []
+    monkeypatch.setattr(src.middleware.app_logger, "warning", warnings.append)
+    monkeypatch.setattr(env_config, "SLOW_REQUEST_SECONDS", 60.0)
+    client = TestClient(timed_app)
+
+    monkeypatch.setattr(env_config, "SLOW_REQUEST_QUERY_COUNT", 3)
+    server_timing = client.get("/queries").headers["Server-Timing"]
+    duration, count = re.fullmatch(r'db;dur=(\d+\.\d{2});desc="(\d+) queries"', server_timing).groups()
+    assert count == "3" and float(duration) >= 30
+    assert warnings == []
+
+    monkeypatch.setattr(env_config, "SLOW_REQUEST_QUERY_COUNT", 2)
+    client.get("/queries")
+    assert len(warnings) == 1
+    assert warnings[0].startswith("Slow request | GET | /queries | 3 queries | db ")
+
+    # or slower than SLOW_REQUEST_SECONDS, whatever the count
+    monkeypatch.setattr(env_config, "SLOW_REQUEST_QUERY_COUNT", 20)
+    monkeypatch.setattr(env_config, "SLOW_REQUEST_SECONDS", 0.02)
+    client.get("/queries")
+    assert len(warnings) == 2
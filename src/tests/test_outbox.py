@@ -0,0 +1,107 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime, timedelta
+import asyncio
+
+from config import env_config
+from database.outbox.models import EmailOutbox
+from src.email.outbox import OutboxService, backoff_delay
+from src.email.smtp import SMTPConnectionPool
+from src.email.worker import OutboxWorker
+
+outbox = OutboxService()
+
+
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def enqueue(db_engine, *recipients: str) -> None:
+    async def add():
+        async with session_factory(db_engine)() as session:
+            for recipient in recipients:
+                outbox.enqueue(session, recipient, "Welcome", {"name": recipient}, "welcome.html")
+            await session.commit()
+    asyncio.run(add())
+
+
+def outbox_rows(db_engine) -> dict:
+    async def fetch():
+        async with session_factory(db_engine)() as session:
+            return {row.recipient: row for row in (await session.execute(select(EmailOutbox))).scalars()}
+    return asyncio.run(fetch())
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(env_config, "EMAIL_OUTBOX_BACKOFF_SECONDS", 30)
+    monkeypatch.setattr(env_config, "EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", 600)
+
+    delays = [backoff_delay(attempts).total_seconds() for attempts in range(1, 8)]
+    assert delays == [30, 60, 120, 240, 480, 600, 600]
+
+
+def test_mark_failed_gives_up_at_max_attempts(monkeypatch):
+    monkeypatch.setattr(env_config, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    message = EmailOutbox(
+        recipient="reader@bookly.example", subject="Welcome", template_name="welcome.html",
+        template_body={}, status="pending", attempts=0, next_attempt_at=datetime.utcnow()
+    )
+
+    assert outbox.mark_failed(message, "421 try later") is True
+    assert outbox.mark_failed(message, "421 try later") is True
+    assert message.status == "pending" and message.next_attempt_at > datetime.utcnow()
+    assert outbox.mark_failed(message, "550 no such user") is False
+    assert (message.status, message.attempts, message.last_error) == ("failed", 3, "550 no such user")
+
+
+def test_concurrent_claims_never_share_a_row(db_engine):
+    enqueue(db_engine, *(f"reader{n}@bookly.example" for n in range(5)))
+
+    async def claim_twice():
+        Session = session_factory(db_engine)
+        async with Session() as first, Session() as second:
+            # the first claim holds its row locks until it commits
+            claimed_first = await outbox.claim_batch(first, 3)
+            # without SKIP LOCKED the second claim would wait on those locks; fail instead of hanging
+            await second.execute(text("SET LOCAL lock_timeout = '2s'"))
+            claimed_second = await outbox.claim_batch(second, 10)
+            await first.commit()
+            await second.commit()
+        return claimed_first, claimed_second
+
+    claimed_first, claimed_second = asyncio.run(claim_twice())
+    assert len(claimed_first) == 3 and len(claimed_second) == 2
+    assert not {message.uid for message in claimed_first} & {message.uid for message in claimed_second}
+
+
+def test_drain_once_marks_rows_sent_or_failed(db_engine, monkeypatch):
+    monkeypatch.setattr(env_config, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    enqueue(db_engine, "reader@bookly.example", "bounce@bookly.example")
+    worker = OutboxWorker(session_factory(db_engine), SMTPConnectionPool(size=1), batch_size=10)
+
+    async def send(email: str, **kwargs) -> None:
+        if email.startswith("bounce"):
+            raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(worker.email_service, "send_html_mail_to_user_email", send)
+
+    assert asyncio.run(worker.drain_once()) == 2
+    rows = outbox_rows(db_engine)
+    assert rows["reader@bookly.example"].status == "sent" and rows["reader@bookly.example"].sent_at
+    bounced = rows["bounce@bookly.example"]
+    assert (bounced.status, bounced.attempts) == ("pending", 1)
+    assert "connection refused" in bounced.last_error
+    # not due again until its backoff has passed
+    assert asyncio.run(worker.drain_once()) == 0
+
+    async def make_due():
+        async with session_factory(db_engine)() as session:
+            message = await session.get(EmailOutbox, bounced.uid)
+            message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+            await session.commit()
+
+    asyncio.run(make_due())
+    assert asyncio.run(worker.drain_once()) == 1
+    assert outbox_rows(db_engine)["bounce@bookly.example"].status == "failed"
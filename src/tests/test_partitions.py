@@ -0,0 +1,108 @@
+from sqlalchemy import event, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import json
+
+from database.partitions import (
+    add_months, attached_partitions, create_partitions, current_month, detach_partitions, partition_name
+)
+from database.reviews.schema import ReviewCreateModel
+from src.reviews.service import ReviewService
+
+SEED = [
+    """
+    INSERT INTO users (uid, username, email, first_name, last_name, role, password_hash, is_verified, created_at, updated_at)
+    VALUES (gen_random_uuid(), 'reader', 'reader@bookly.example', 'Bookly', 'Reader', 'user', '-', true, now(), now())
+    """,
+    """
+    INSERT INTO books (uid, title, author, published_date, publisher, page_count, language, user_uid, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Book', 'Author', now(), 'Publisher', 300, 'English', uid, now(), now() FROM users
+    """,
+]
+
+
+def scanned_relations(plan: dict):
+    if "Relation Name" in plan:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from scanned_relations(child)
+
+
+def test_add_review_reads_back_from_one_partition(db_engine):
+    this_month = current_month()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "WHERE reviews.uid =" in statement:
+            statements.append((statement, parameters))
+
+    async def add_review():
+        async with db_engine.begin() as conn:
+            await conn.run_sync(create_partitions, add_months(this_month, -12), this_month)
+            for statement in SEED:
+                await conn.execute(text(statement))
+            book_uid = (await conn.execute(text("SELECT uid FROM books"))).scalar_one()
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with AsyncSession(db_engine, expire_on_commit=False) as session:
+                review = await ReviewService().add_review(
+                    "reader@bookly.example", book_uid, ReviewCreateModel(rating=4, review_text="ok"), session
+                )
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+        async with db_engine.connect() as conn:
+            stored_in = (await conn.execute(
+                text("SELECT tableoid::regclass::text FROM reviews WHERE uid = :uid"), {"uid": review.uid}
+            )).scalar_one()
+            plans = []
+            for statement, parameters in statements:
+                plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar_one()
+                plans.append(json.loads(plan)[0]["Plan"] if isinstance(plan, str) else plan[0]["Plan"])
+        return stored_in, plans
+
+    stored_in, plans = asyncio.run(add_review())
+    assert stored_in == partition_name(this_month)
+    # the refresh after the insert selects by (uid, created_at): pruned to the review's month
+    assert plans
+    for plan in plans:
+        assert list(scanned_relations(plan)) == [partition_name(this_month)]
+
+
+def test_detach_partitions_past_retention(db_engine):
+    this_month = current_month()
+    oldest = add_months(this_month, -14)
+
+    async def detach():
+        async with db_engine.begin() as conn:
+            await conn.run_sync(create_partitions, oldest, this_month)
+            for statement in SEED:
+                await conn.execute(text(statement))
+            await conn.execute(text("""
+                INSERT INTO reviews (uid, rating, review_text, user_uid, book_uid, created_at, updated_at)
+                SELECT gen_random_uuid(), 3, 'old', user_uid, uid, :created_at, :created_at FROM books
+            """), {"created_at": oldest})
+
+        autocommit = await db_engine.connect()
+        autocommit = await autocommit.execution_options(isolation_level="AUTOCOMMIT")
+        detached = []
+        try:
+            detached = await autocommit.run_sync(detach_partitions, add_months(this_month, -12))
+            still_attached = [name for name, _ in await autocommit.run_sync(attached_partitions)]
+            visible = (await autocommit.execute(text("SELECT count(*) FROM reviews"))).scalar_one()
+            archived = (await autocommit.execute(text(f"SELECT count(*) FROM {partition_name(oldest)}"))).scalar_one()
+            again = await autocommit.run_sync(detach_partitions, add_months(this_month, -12))
+        finally:
+            # detached tables are not dropped with reviews; keep the next test's schema clean
+            for name in detached:
+                await autocommit.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            await autocommit.close()
+        return detached, still_attached, visible, archived, again
+
+    detached, still_attached, visible, archived, again = asyncio.run(detach())
+    assert detached == [partition_name(oldest), partition_name(add_months(oldest, 1))]
+    assert partition_name(add_months(this_month, -12)) in still_attached
+    assert not set(detached) & set(still_attached)
+    assert (visible, archived) == (0, 1)
+    assert again == []
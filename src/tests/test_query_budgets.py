@@ -0,0 +1,111 @@
+from src.auth.utils import create_url_safe_token
+
+api_prefix = "/api/v1"
+
+book_data = {
+    "title": "A Game of Thrones",
+    "author": "George R. R. Martin",
+    "published_date": "1996-08-06T00:00:00",
+    "publisher": "Bantam Books",
+    "page_count": 694,
+    "language": "English"
+}
+
+
+def signed_up_user(client, username: str = "reader") -> dict:
+    """Register, verify and log in a user; returns its auth headers."""
+    email = f"{username}@bookly.example"
+    client.post(f"{api_prefix}/auth/register", json={
+        "email": email,
+        "username": username,
+        "password": "pw123456",
+        "first_name": "Bookly",
+        "last_name": "Reader"
+    })
+    token = create_url_safe_token({"email": email})
+    client.get(f"{api_prefix}/auth/verify-email", params={"token": token})
+    response = client.post(f"{api_prefix}/auth/login", json={"email": email, "password": "pw123456"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def add_book_with_reviews(client, headers: dict, reviews: int = 0) -> str:
+    book_id = client.post(f"{api_prefix}/books/", json=book_data, headers=headers).json()["uid"]
+    for rating in range(1, reviews + 1):
+        client.post(f"{api_prefix}/reviews/book/{book_id}", json={"rating": rating, "review_text": "ok"}, headers=headers)
+    return book_id
+
+
+def test_auth_router_query_budgets(db_client, query_recorder):
+    email = "reader@bookly.example"
+    # every block also checks the status: a request failing before it reaches the database would pass any budget
+    with query_recorder.query_budget(max_queries=2):
+        response = db_client.post(f"{api_prefix}/auth/register", json={
+            "email": email, "username": "reader", "password": "pw123456",
+            "first_name": "Bookly", "last_name": "Reader"
+        })
+        assert response.status_code == 201
+    with query_recorder.query_budget(max_queries=4):
+        response = db_client.get(f"{api_prefix}/auth/verify-email", params={"token": create_url_safe_token({"email": email})})
+        assert response.status_code == 200
+    with query_recorder.query_budget(max_queries=1):
+        response = db_client.post(f"{api_prefix}/auth/login", json={"email": email, "password": "pw123456"})
+        assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    add_book_with_reviews(db_client, headers, reviews=2)
+
+    with query_recorder.query_budget(max_queries=4):
+        assert db_client.get(f"{api_prefix}/auth/me", headers=headers).status_code == 200
+    with query_recorder.query_budget(max_queries=2):
+        assert db_client.post(f"{api_prefix}/auth/pswd-reset-req", json={"email": email}, headers=headers).status_code == 200
+    with query_recorder.query_budget(max_queries=4):
+        response = db_client.post(
+            f"{api_prefix}/auth/pswd-reset-confirm",
+            params={"token": create_url_safe_token({"email": email})},
+            json={"new_password": "pw654321", "confirm_new_password": "pw654321"},
+            headers=headers
+        )
+        assert response.status_code == 200
+    with query_recorder.query_budget(max_queries=0):
+        assert db_client.post(f"{api_prefix}/auth/logout", headers=headers).status_code == 200
+
+
+def test_books_router_query_budgets(db_client, query_recorder):
+    headers = signed_up_user(db_client)
+
+    with query_recorder.query_budget(max_queries=4):
+        response = db_client.post(f"{api_prefix}/books/", json=book_data, headers=headers)
+        assert response.status_code == 201
+    book_id = response.json()["uid"]
+    with query_recorder.query_budget(max_queries=3):
+        assert db_client.get(f"{api_prefix}/books/{book_id}", headers=headers).status_code == 200
+    # one compare-and-set UPDATE, then the reviews for the response
+    with query_recorder.query_budget(max_queries=3):
+        response = db_client.patch(f"{api_prefix}/books/{book_id}", json={**book_data, "title": "A Clash of Kings"}, headers=headers)
+        assert response.status_code == 200
+    # a soft delete: one UPDATE plus the book's tombstone for the changes feed
+    with query_recorder.query_budget(max_queries=3):
+        assert db_client.delete(f"{api_prefix}/books/{book_id}", headers=headers).status_code == 200
+
+
+def test_book_listing_does_not_query_per_book(db_client, query_recorder):
+    headers = signed_up_user(db_client)
+    for _ in range(5):
+        add_book_with_reviews(db_client, headers, reviews=2)
+    # the profile loads books and reviews in one query each, never per book
+    with query_recorder.query_budget(max_queries=4, max_repeats=1):
+        user_id = db_client.get(f"{api_prefix}/auth/me", headers=headers).json()["uid"]
+
+    with query_recorder.query_budget(max_queries=3, max_repeats=1):
+        assert len(db_client.get(f"{api_prefix}/books/", headers=headers).json()) == 5
+    with query_recorder.query_budget(max_queries=3, max_repeats=1):
+        assert len(db_client.get(f"{api_prefix}/books/user/{user_id}", headers=headers).json()) == 5
+
+
+def test_reviews_router_query_budgets(db_client, query_recorder):
+    headers = signed_up_user(db_client)
+    book_id = add_book_with_reviews(db_client, headers, reviews=3)
+
+    # the book's existing reviews are never loaded, however many there are
+    with query_recorder.query_budget(max_queries=5):
+        response = db_client.post(f"{api_prefix}/reviews/book/{book_id}", json={"rating": 4, "review_text": "ok"}, headers=headers)
+        assert response.status_code == 200
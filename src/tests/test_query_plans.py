@@ -0,0 +1,130 @@
+from sqlalchemy import event, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import json
+import uuid
+
+from config import env_config
+from database.books.schema import BookUpdateModel
+from database.reviews.schema import ReviewCreateModel
+from src.auth.service import AuthService
+from src.books.service import BookService
+from src.reviews.service import ReviewService
+from src.sync.service import SyncService
+
+USERS = 1500
+BOOKS_PER_USER = 40
+REVIEWS_PER_BOOK = 3
+
+SEED = [
+    f"""
+    INSERT INTO users (uid, username, email, first_name, last_name, role, password_hash, is_verified, created_at, updated_at)
+    SELECT gen_random_uuid(), 'reader' || i, 'reader' || i || '@bookly.example', 'Bookly', 'Reader', 'user', '-', true,
+           now() - i * interval '1 hour', now()
+    FROM generate_series(1, {USERS}) AS i
+    """,
+    f"""
+    INSERT INTO books (uid, title, author, published_date, publisher, page_count, language, user_uid, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Book ' || n, 'Author', now(), 'Publisher', 300, 'English', users.uid,
+           now() - (random() * 1000) * interval '1 day', now()
+    FROM users, generate_series(1, {BOOKS_PER_USER}) AS n
+    """,
+    f"""
+    INSERT INTO reviews (uid, rating, review_text, user_uid, book_uid, created_at, updated_at)
+    SELECT gen_random_uuid(), 1 + n % 4, 'ok', books.user_uid, books.uid, now(), now()
+    FROM books, generate_series(1, {REVIEWS_PER_BOOK}) AS n
+    """,
+    "ANALYZE users",
+    "ANALYZE books",
+    "ANALYZE reviews",
+]
+
+# reviews is partitioned; plans name the partitions and their indexes
+PARENTS = text("""
+    SELECT child.relname, parent.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+""")
+# the months ahead have no reviews yet; scanning those is free
+EMPTY_PARTITIONS = text("SELECT relname FROM pg_class WHERE relispartition AND reltuples = 0")
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def test_service_queries_use_indexes(db_engine, monkeypatch):
+    """Every SELECT the services issue must reach books and reviews through an index."""
+    book_service = BookService()
+    review_service = ReviewService()
+    auth_service = AuthService()
+    sync_service = SyncService()
+    statements = []
+    # serve the seeded rows, so the second feed page filters on the first page's cursor
+    monkeypatch.setattr(env_config, "SYNC_SETTLE_SECONDS", 0)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    async def run_service_queries():
+        async with db_engine.begin() as conn:
+            for statement in SEED:
+                await conn.execute(text(statement))
+            row = (await conn.execute(text(
+                "SELECT users.uid, users.email, books.uid FROM users JOIN books ON books.user_uid = users.uid LIMIT 1"
+            ))).one()
+        user_uid, email, book_uid = row
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with AsyncSession(db_engine, expire_on_commit=False) as session:
+                await book_service.get_all_books(session)
+                await book_service.get_book_by_id(session, book_uid)
+                await book_service.get_user_books(session, str(user_uid))
+                await auth_service.get_user_profile(email, session)
+                await review_service.add_review(email, book_uid, ReviewCreateModel(rating=4, review_text="ok"), session)
+                await book_service.update_book(session, book_uid, BookUpdateModel(
+                    title="Renamed", author="Author", publisher="Publisher", page_count=300, language="English"
+                ))
+                await book_service.delete_book(session, book_uid)
+                page = await sync_service.get_changes(session, None, 200)
+                await sync_service.get_changes(session, page["cursor"], 200)
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+        plans = []
+        async with db_engine.connect() as conn:
+            parents = dict((await conn.execute(PARENTS)).all())
+            empty = set((await conn.execute(EMPTY_PARTITIONS)).scalars())
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar_one()
+                plans.append((statement, json.loads(plan)[0]["Plan"] if isinstance(plan, str) else plan[0]["Plan"]))
+        return plans, parents, empty
+
+    plans, parents, empty = asyncio.run(run_service_queries())
+    assert plans
+    used_indexes = set()
+    for statement, plan in plans:
+        for node in plan_nodes(plan):
+            relation = parents.get(node.get("Relation Name"), node.get("Relation Name"))
+            if node.get("Relation Name") in empty:
+                continue
+            assert not (node["Node Type"] == "Seq Scan" and relation in ("books", "reviews")), (
+                f"sequential scan on {node['Relation Name']}:\n{statement}"
+            )
+            if "Index Name" in node:
+                used_indexes.add(parents.get(node["Index Name"], node["Index Name"]))
+
+    assert {
+        "ix_books_created_at",
+        "ix_books_user_uid_created_at",
+        "ix_reviews_book_uid",
+        "ix_reviews_user_uid",
+        "ix_books_updated_at_uid",
+        "ix_reviews_updated_at_uid",
+    } <= used_indexes
@@ -0,0 +1,80 @@
+import logging
+import queue
+import threading
+
+from prometheus_client import REGISTRY
+
+from logger.queue_logging import BoundedQueueHandler, RoutingQueueListener
+
+
+def record(message: str, name: str = "bookly_app") -> logging.LogRecord:
+    return logging.LogRecord(name, logging.INFO, __file__, 1, message, None, None)
+
+
+def dropped_total() -> float:
+    return REGISTRY.get_sample_value("bookly_log_records_dropped_total") or 0.0
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = []
+        self.flushed = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+    def flush(self) -> None:
+        self.flushed = True
+
+
+def test_full_queue_drops_and_counts_records():
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, overflow="drop")
+    before = dropped_total()
+
+    for n in range(5):
+        handler.handle(record(f"record {n}"))
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 3
+    assert dropped_total() - before == 3
+
+
+def test_full_queue_blocks_the_caller_until_there_is_room():
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, overflow="block")
+    before = dropped_total()
+    handler.handle(record("first"))
+
+    writer = threading.Thread(target=handler.handle, args=(record("second"),), daemon=True)
+    writer.start()
+    writer.join(timeout=0.2)
+    assert writer.is_alive()
+
+    assert log_queue.get_nowait().getMessage() == "first"
+    writer.join(timeout=2)
+    assert not writer.is_alive()
+    assert log_queue.get_nowait().getMessage() == "second"
+    assert handler.dropped == 0 and dropped_total() == before
+
+
+def test_listener_writes_out_queued_records_on_stop():
+    log_queue = queue.Queue(maxsize=100)
+    handler = BoundedQueueHandler(log_queue, overflow="block")
+    listener = RoutingQueueListener(log_queue)
+    app_handler, user_handler = CollectingHandler(), CollectingHandler()
+    listener.add_route("bookly_app", app_handler)
+    listener.add_route("bookly_user", user_handler)
+
+    # stop() must not return before everything already queued is written
+    for n in range(50):
+        handler.handle(record(f"record {n}"))
+    handler.handle(record("GET /api/v1/books", name="bookly_user.alice"))
+    listener.start()
+    listener.stop()
+
+    assert app_handler.messages == [f"record {n}" for n in range(50)]
+    assert user_handler.messages == ["GET /api/v1/books"]
+    assert app_handler.flushed and user_handler.flushed
+    assert not listener.running
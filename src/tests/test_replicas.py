@@ -0,0 +1,136 @@
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+from datetime import datetime
+import asyncio
+import os
+import pytest
+
+from database.models import Books, User
+from database.replicas import ReplicaSet
+from metrics.app_metrics import instrument_engine
+import database.main
+
+from .test_query_budgets import api_prefix, book_data, signed_up_user
+
+# a second Postgres instance standing in for a replica; reset per test like TEST_DATABASE_URL
+TEST_REPLICA_DATABASE_URL = os.environ.get("TEST_REPLICA_DATABASE_URL")
+
+
+@pytest.fixture
+def replica_engine():
+    if not TEST_REPLICA_DATABASE_URL:
+        pytest.skip("TEST_REPLICA_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_REPLICA_DATABASE_URL, poolclass=NullPool)
+
+    async def reset_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(reset_tables())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def recent_writes(monkeypatch):
+    """Keeps the read-your-writes windows in memory instead of Redis."""
+    users = set()
+
+    async def mark_recent_write(user_uid: str) -> None:
+        users.add(user_uid)
+
+    async def has_recent_write(user_uid: str) -> bool:
+        return user_uid in users
+
+    monkeypatch.setattr(database.main, "mark_recent_write", mark_recent_write)
+    monkeypatch.setattr(database.main, "has_recent_write", has_recent_write)
+    return users
+
+
+def use_replicas(monkeypatch, *engines, max_lag: float = 5.0) -> ReplicaSet:
+    replica_set = ReplicaSet(list(engines), max_lag=max_lag, check_interval=3600)
+    monkeypatch.setattr(database.main, "replica_set", replica_set)
+    return replica_set
+
+
+def replicate_users(db_engine, replica_engine) -> None:
+    """Copies the signed-up users to the replica, as replication would."""
+    async def copy():
+        async with db_engine.connect() as conn:
+            users = (await conn.execute(User.__table__.select())).mappings().all()
+        async with replica_engine.begin() as conn:
+            await conn.execute(User.__table__.insert(), [dict(user) for user in users])
+    asyncio.run(copy())
+
+
+def book_titles(client, headers: dict) -> list:
+    response = client.get(f"{api_prefix}/books/", headers=headers)
+    assert response.status_code == 200
+    return [book["title"] for book in response.json()]
+
+
+def test_reads_use_replica_until_the_user_writes(db_engine, db_client, replica_engine, recent_writes, query_recorder, monkeypatch):
+    headers = signed_up_user(db_client)
+    replicate_users(db_engine, replica_engine)
+    use_replicas(monkeypatch, replica_engine)
+
+    async def add_replica_only_book():
+        async with replica_engine.begin() as conn:
+            await conn.execute(Books.__table__.insert().values(
+                **{**book_data, "title": "Only on the replica", "published_date": datetime(1996, 8, 6)}
+            ))
+
+    asyncio.run(add_replica_only_book())
+    # the token user and its role are resolved on the replica too
+    with query_recorder.query_budget(max_queries=0):
+        assert book_titles(db_client, headers) == ["Only on the replica"]
+
+    assert db_client.post(f"{api_prefix}/books/", json=book_data, headers=headers).status_code == 201
+    assert len(recent_writes) == 1
+    # the writer reads its own book from the primary
+    assert book_titles(db_client, headers) == [book_data["title"]]
+
+    recent_writes.clear()
+    assert book_titles(db_client, headers) == ["Only on the replica"]
+
+
+def test_unreachable_replica_falls_back_to_primary(db_client, recent_writes, monkeypatch):
+    headers = signed_up_user(db_client)
+    db_client.post(f"{api_prefix}/books/", json=book_data, headers=headers)
+    recent_writes.clear()
+    down = create_async_engine("postgresql+asyncpg://bookly@127.0.0.1:1/bookly", poolclass=NullPool)
+    replica_set = use_replicas(monkeypatch, down)
+
+    assert book_titles(db_client, headers) == [book_data["title"]]
+    assert replica_set.lag[down] is None
+    assert replica_set.choose() is None
+
+
+def test_lagging_replica_is_skipped(replica_engine, monkeypatch):
+    replica_set = use_replicas(monkeypatch, replica_engine, max_lag=-1)
+    asyncio.run(replica_set.refresh())
+    # a standalone server reports no lag, which still exceeds max_lag=-1
+    assert replica_set.lag[replica_engine] == 0
+    assert replica_set.choose() is None
+
+
+def test_replica_pool_usage_is_labelled_by_engine(replica_engine):
+    engine = create_async_engine(TEST_REPLICA_DATABASE_URL, pool_size=1, max_overflow=1)
+    instrument_engine(engine, "replica-under-test")
+
+    def pool_sample(name: str) -> float:
+        return REGISTRY.get_sample_value(name, {"engine": "replica-under-test"})
+
+    async def check_out_two() -> tuple:
+        async with engine.connect(), engine.connect():
+            during = pool_sample("bookly_db_pool_checked_out"), pool_sample("bookly_db_pool_overflow")
+        await engine.dispose()
+        return during, (pool_sample("bookly_db_pool_checked_out"), pool_sample("bookly_db_pool_overflow"))
+
+    during, after = asyncio.run(check_out_two())
+    # the second connection is beyond pool_size=1
+    assert during == (2, 1)
+    assert after == (0, 0)
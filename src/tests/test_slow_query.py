@@ -0,0 +1,30 @@
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+import pytest
+
+from database.books.models import Books
+from database.outbox.models import EmailOutbox
+from database.slow_query import is_read_only
+
+
+def compiled(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("statement, explainable", [
+    (compiled(select(Books).where(Books.deleted_at.is_(None))), True),
+    ("  WITH recent AS (SELECT uid FROM books) SELECT * FROM recent", True),
+    # updated_at is a column, not an UPDATE
+    ("SELECT updated_at FROM books ORDER BY updated_at", True),
+    # the outbox claim would take its row locks a second time
+    (compiled(select(EmailOutbox).limit(5).with_for_update(skip_locked=True)), False),
+    ("SELECT * FROM books FOR SHARE", False),
+    ("SELECT * FROM books FOR KEY SHARE", False),
+    ("WITH gone AS (DELETE FROM books RETURNING uid) SELECT * FROM gone", False),
+    ("WITH bumped AS (UPDATE books SET version = version + 1 RETURNING uid) SELECT uid FROM bumped", False),
+    ("WITH added AS (INSERT INTO tombstones DEFAULT VALUES RETURNING uid) SELECT uid FROM added", False),
+    ("UPDATE books SET title = 'x'", False),
+    (compiled(text("DELETE FROM books")), False),
+])
+def test_only_read_only_statements_are_explained(statement, explainable):
+    assert is_read_only(statement) is explainable
@@ -0,0 +1,80 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+
+from database.purge import PurgeJob
+from .test_query_budgets import add_book_with_reviews, api_prefix, signed_up_user
+
+
+def fetch_all(db_engine, statement: str) -> list:
+    async def fetch():
+        async with db_engine.connect() as conn:
+            return (await conn.execute(text(statement))).all()
+    return asyncio.run(fetch())
+
+
+def purge_until_done(db_engine) -> int:
+    """Run the purge with a tiny batch until a pass finds nothing; returns the number of passes."""
+    job = PurgeJob(async_sessionmaker(db_engine, class_=AsyncSession), batch_size=1)
+    passes = 1
+    while asyncio.run(job.purge_once()):
+        passes += 1
+    return passes
+
+
+def test_deleted_book_is_hidden_until_purged(db_engine, db_client):
+    headers = signed_up_user(db_client)
+    book_id = add_book_with_reviews(db_client, headers, reviews=2)
+    kept_id = add_book_with_reviews(db_client, headers)
+
+    db_client.delete(f"{api_prefix}/books/{book_id}", headers=headers)
+    assert [book["uid"] for book in db_client.get(f"{api_prefix}/books/", headers=headers).json()] == [kept_id]
+    for request in (db_client.get, db_client.delete):
+        response = request(f"{api_prefix}/books/{book_id}", headers=headers)
+        assert response.status_code == 404
+        assert response.json()["detail"]["error_code"] == "BOOK_NOT_FOUND"
+    # still there, only flagged, and already reported to the changes feed
+    assert fetch_all(db_engine, f"SELECT deleted_at IS NOT NULL FROM books WHERE uid = '{book_id}'") == [(True,)]
+    assert len(fetch_all(db_engine, "SELECT * FROM reviews")) == 2
+    assert fetch_all(db_engine, "SELECT kind FROM tombstones") == [("book",)]
+
+    assert purge_until_done(db_engine) > 1
+    assert fetch_all(db_engine, "SELECT uid::text FROM books") == [(kept_id,)]
+    assert fetch_all(db_engine, "SELECT * FROM reviews") == []
+    assert sorted(fetch_all(db_engine, "SELECT kind FROM tombstones")) == [("book",), ("review",), ("review",)]
+
+
+def test_deleted_account_is_purged_with_its_books_and_reviews(db_engine, db_client):
+    headers = signed_up_user(db_client)
+    other_headers = signed_up_user(db_client, username="other")
+    own_book = add_book_with_reviews(db_client, headers, reviews=1)
+    other_book = add_book_with_reviews(db_client, other_headers, reviews=1)
+    # a review of the deleted user's book, and one by the deleted user on a book that stays
+    db_client.post(f"{api_prefix}/reviews/book/{own_book}", json={"rating": 3, "review_text": "ok"}, headers=other_headers)
+    db_client.post(f"{api_prefix}/reviews/book/{other_book}", json={"rating": 3, "review_text": "ok"}, headers=headers)
+
+    assert db_client.delete(f"{api_prefix}/auth/me", headers=headers).status_code == 200
+    # the token is still signed, but its user is gone
+    assert db_client.get(f"{api_prefix}/auth/me", headers=headers).json()["detail"]["error_code"] == "USER_NOT_FOUND"
+    assert db_client.get(f"{api_prefix}/books/{own_book}", headers=other_headers).status_code == 404
+
+    purge_until_done(db_engine)
+    assert fetch_all(db_engine, "SELECT username FROM users") == [("other",)]
+    assert fetch_all(db_engine, "SELECT uid::text FROM books") == [(other_book,)]
+    assert len(fetch_all(db_engine, "SELECT * FROM reviews")) == 1
+    assert sorted(fetch_all(db_engine, "SELECT kind FROM tombstones")) == [("book",)] + [("review",)] * 3
+
+
+def test_profile_hides_reviews_of_deleted_books(db_client):
+    headers = signed_up_user(db_client)
+    other_headers = signed_up_user(db_client, username="other")
+    deleted_book = add_book_with_reviews(db_client, other_headers)
+    kept_book = add_book_with_reviews(db_client, other_headers)
+    for book_id in (deleted_book, kept_book):
+        db_client.post(f"{api_prefix}/reviews/book/{book_id}", json={"rating": 3, "review_text": "ok"}, headers=headers)
+
+    assert db_client.delete(f"{api_prefix}/books/{deleted_book}", headers=other_headers).status_code == 200
+    profile = db_client.get(f"{api_prefix}/auth/me", headers=headers).json()
+    # like the books list, which already leaves the deleted book out
+    assert [review["book_uid"] for review in profile["reviews"]] == [kept_book]
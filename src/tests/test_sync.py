@@ -0,0 +1,84 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+
+from config import env_config
+from database.purge import PurgeJob
+
+from .test_query_budgets import api_prefix, book_data, signed_up_user
+
+
+def sync_all(client, headers: dict, cursor: str | None = None, limit: int = 2) -> tuple:
+    """Follow the feed until has_more is false; returns everything seen and the last cursor."""
+    seen = {"books": [], "reviews": [], "deleted": []}
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"{api_prefix}/sync/changes", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        for name in seen:
+            assert len(page[name]) <= limit
+            seen[name] += page[name]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return seen, cursor
+
+
+def test_changes_feed_pages_through_updates_and_deletes(db_engine, db_client, monkeypatch):
+    monkeypatch.setattr(env_config, "SYNC_SETTLE_SECONDS", 0)
+    headers = signed_up_user(db_client)
+    book_ids = [
+        db_client.post(f"{api_prefix}/books/", json={**book_data, "title": f"Book {n}"}, headers=headers).json()["uid"]
+        for n in range(5)
+    ]
+    review_ids = [
+        db_client.post(f"{api_prefix}/reviews/book/{book_id}", json={"rating": 4, "review_text": "ok"}, headers=headers).json()["uid"]
+        for book_id in book_ids[:2]
+    ]
+    db_client.patch(f"{api_prefix}/books/{book_ids[1]}", json={**book_data, "title": "Renamed"}, headers=headers)
+    db_client.delete(f"{api_prefix}/books/{book_ids[0]}", headers=headers)
+    # the deleted book's review goes, with its tombstone, when the purge runs
+    asyncio.run(PurgeJob(async_sessionmaker(db_engine, class_=AsyncSession)).purge_once())
+
+    seen, cursor = sync_all(db_client, headers)
+    assert sorted(book["uid"] for book in seen["books"]) == sorted(book_ids[1:])
+    renamed = next(book for book in seen["books"] if book["uid"] == book_ids[1])
+    assert renamed["title"] == "Renamed" and renamed["updated_at"] > renamed["created_at"]
+    assert [review["uid"] for review in seen["reviews"]] == review_ids[1:]
+    assert sorted((row["kind"], row["record_uid"]) for row in seen["deleted"]) == [
+        ("book", book_ids[0]), ("review", review_ids[0])
+    ]
+
+    # nothing new: an empty page; then only what changed since the cursor
+    assert sync_all(db_client, headers, cursor)[0] == {"books": [], "reviews": [], "deleted": []}
+    db_client.patch(f"{api_prefix}/books/{book_ids[4]}", json={**book_data, "title": "Renamed again"}, headers=headers)
+    seen, _ = sync_all(db_client, headers, cursor)
+    assert [book["title"] for book in seen["books"]] == ["Renamed again"]
+
+
+def test_changes_feed_holds_back_reviews_of_deleted_books_and_users(db_client, monkeypatch):
+    monkeypatch.setattr(env_config, "SYNC_SETTLE_SECONDS", 0)
+    headers = signed_up_user(db_client)
+    leaving = signed_up_user(db_client, username="leaving")
+    kept_book, deleted_book = (
+        db_client.post(f"{api_prefix}/books/", json={**book_data, "title": title}, headers=headers).json()["uid"]
+        for title in ("Kept", "Deleted")
+    )
+    review = {"rating": 4, "review_text": "ok"}
+    kept_review = db_client.post(f"{api_prefix}/reviews/book/{kept_book}", json=review, headers=headers).json()["uid"]
+    db_client.post(f"{api_prefix}/reviews/book/{deleted_book}", json=review, headers=headers)
+    db_client.post(f"{api_prefix}/reviews/book/{kept_book}", json=review, headers=leaving)
+
+    assert db_client.delete(f"{api_prefix}/books/{deleted_book}", headers=headers).status_code == 200
+    assert db_client.delete(f"{api_prefix}/auth/me", headers=leaving).status_code == 200
+    # before any purge: the rows still exist, but only the live review is served
+    seen, _ = sync_all(db_client, headers)
+    assert [review["uid"] for review in seen["reviews"]] == [kept_review]
+    assert [book["uid"] for book in seen["books"]] == [kept_book]
+
+
+def test_changes_feed_rejects_a_bad_cursor(db_client):
+    headers = signed_up_user(db_client)
+    response = db_client.get(f"{api_prefix}/sync/changes", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == "INVALID_SYNC_CURSOR"
@@ -0,0 +1,57 @@
+import asyncio
+
+import tracing.tracer as tracer_module
+from tracing.tracer import SpanBatcher, Tracer, trace_methods
+
+
+class ListExporter:
+    def __init__(self) -> None:
+        self.spans = []
+
+    def export(self, spans) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+@trace_methods
+class LookupService:
+    async def find(self) -> str:
+        return self.normalize(" Dune ")
+
+    def normalize(self, title: str) -> str:
+        return title.strip()
+
+
+def test_spans_nest_under_the_request_trace(monkeypatch):
+    exporter = ListExporter()
+    batcher = SpanBatcher(exporter, interval=0.01)
+    monkeypatch.setattr(tracer_module, "tracer", Tracer(batcher, sample_rate=1.0))
+
+    async def request() -> str:
+        with tracer_module.tracer.start_trace("GET /books/{book_id}") as root:
+            assert await LookupService().find() == "Dune"
+        return root.trace_id
+
+    trace_id = asyncio.run(request())
+    assert asyncio.run(LookupService().find()) == "Dune"  # outside a trace: no spans
+    batcher.shutdown()
+
+    spans = {span.name: span for span in exporter.spans}
+    assert set(spans) == {"GET /books/{book_id}", "LookupService.find", "LookupService.normalize"}
+    assert {span.trace_id for span in spans.values()} == {trace_id}
+    assert spans["LookupService.find"].parent_id == spans["GET /books/{book_id}"].span_id
+    assert spans["LookupService.normalize"].parent_id == spans["LookupService.find"].span_id
+
+
+def test_unsampled_requests_record_nothing():
+    exporter = ListExporter()
+    batcher = SpanBatcher(exporter, interval=0.01)
+    tracer = Tracer(batcher, sample_rate=0.0)
+
+    with tracer.start_trace("GET /test") as root:
+        assert root is None
+    batcher.shutdown()
+
+    assert exporter.spans == []
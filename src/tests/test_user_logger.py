@@ -0,0 +1,43 @@
+import gc
+import os
+import sys
+import tracemalloc
+import pytest
+
+from logger import user_logger
+from logger.queue_logging import log_queue, queue_handler
+from logger.user_logger import get_user_logger, user_log_handler
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def log_for_users(start: int, stop: int) -> None:
+    for i in range(start, stop):
+        get_user_logger(f"reader{i}@bookly.example").info("Request: GET /api/v1/books")
+    log_queue.join()
+    gc.collect()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="counts descriptors in /proc/self/fd")
+def test_user_loggers_stay_bounded_for_50k_users(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_logger, "USER_LOG_DIR", tmp_path)
+    monkeypatch.setattr(queue_handler, "overflow", "block")
+
+    # fill both caches first, so the second run only measures steady state
+    tracemalloc.start()
+    log_for_users(0, 5_000)
+    fds_before = open_fds()
+    memory_before, _ = tracemalloc.get_traced_memory()
+
+    log_for_users(5_000, 50_000)
+    fds_after = open_fds()
+    memory_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(user_logger._user_loggers) <= user_logger.env_config.USER_LOGGER_CACHE_SIZE
+    assert user_log_handler.open_files <= user_log_handler.max_open_files
+    assert fds_after <= fds_before
+    assert memory_after - memory_before < 1024 * 1024
+    assert (tmp_path / "reader49999_bookly_example.log").read_text().endswith("Request: GET /api/v1/books\n")
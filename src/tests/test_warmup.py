@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+import asyncio
+import threading
+import time
+
+from config import env_config
+import src.warmup
+
+from main import app, warmup
+from .conftest import TEST_DATABASE_URL
+
+
+def wait_until_ready(client, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            return response
+        time.sleep(0.05)
+
+
+def test_ready_answers_503_until_warm_up_succeeds(monkeypatch):
+    async def warm_database() -> None:
+        pass
+
+    async def redis_down() -> None:
+        raise ConnectionError("redis is down")
+
+    released = threading.Event()
+    # if /ready ever waits for the warm-up again, this turns a hang into a failure
+    safety_net = threading.Timer(3, released.set)
+
+    async def slow_database() -> None:
+        while not released.is_set():
+            await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(warmup, "ready", False)
+    monkeypatch.setattr(warmup, "_retry", None)
+    monkeypatch.setattr(warmup, "prefill_pool", warm_database)
+    monkeypatch.setattr(warmup, "ping_redis", redis_down)
+    # the context manager runs the lifespan, and with it the startup warm-up
+    safety_net.start()
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"] == {
+            "database": "ok", "redis": "ConnectionError: redis is down", "routes": "ok"
+        }
+
+        # while a retry is stuck on the database, probes still answer at once
+        monkeypatch.setattr(warmup, "prefill_pool", slow_database)
+        monkeypatch.setattr(warmup, "ping_redis", warm_database)
+        wait_until_ready(client, timeout=0.2)
+        start = time.perf_counter()
+        assert client.get("/ready").status_code == 503
+        assert time.perf_counter() - start < 1
+
+        released.set()
+        response = wait_until_ready(client)
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+    safety_net.cancel()
+
+
+def test_prefill_pool_leaves_primed_connections_in_the_pool(db_engine, monkeypatch):
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=3)
+    monkeypatch.setattr(src.warmup, "engine", engine)
+    monkeypatch.setattr(env_config, "DB_POOL_SIZE", 3)
+
+    async def prefill() -> int:
+        await warmup.prefill_pool()
+        checked_in = engine.pool.checkedin()
+        await engine.dispose()
+        return checked_in
+
+    assert asyncio.run(prefill()) == 3
@@ -0,0 +1,109 @@
+import asyncio
+import time
+import uuid
+from typing import Dict
+
+import httpx
+from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import env_config
+from database.main import engine
+from database.redis import token_blocklist, bulk_mail_store, recent_writes
+from logger.app_logger import app_logger
+from src.auth.service import AuthService
+from src.books.service import BookService
+
+# lookups that match nothing, so priming reads no rows
+NO_SUCH_UID = uuid.UUID(int=0)
+NO_SUCH_EMAIL = "warmup@bookly.invalid"
+
+auth_service = AuthService()
+book_service = BookService()
+
+
+async def prime_queries(session: AsyncSession) -> None:
+    """
+    Run the hot BookService/AuthService queries once on the session's
+    connection, so their statements are prepared and asyncpg has introspected
+    the column types. The unfiltered book listing is left out; it would read
+    every book.
+    """
+    await auth_service.get_user_auth_claims(NO_SUCH_EMAIL, session)
+    await auth_service.get_user_profile(NO_SUCH_EMAIL, session)
+    await book_service.get_book_by_id(session, NO_SUCH_UID)
+    await book_service.get_user_books(session, str(NO_SUCH_UID))
+
+
+class Warmup:
+    """
+    Pays the first-request costs before the process reports ready: opens and
+    primes database connections, connects to Redis and sends one request
+    through the middleware stack and router.
+
+    A failed step leaves the process not ready; the next readiness check
+    starts another attempt in the background (retry_in_background()).
+    """
+    def __init__(self, app: FastAPI, connections: int) -> None:
+        self.app = app
+        self.connections = connections
+        self.ready = False
+        self.checks: Dict[str, str] = {}
+        self.seconds: float | None = None
+        self._lock = asyncio.Lock()
+        self._retry: asyncio.Task | None = None
+
+    async def run(self) -> bool:
+        async with self._lock:
+            if self.ready:
+                return True
+            start = time.perf_counter()
+            checks = {}
+            for name, step in (
+                ("database", self.prefill_pool),
+                ("redis", self.ping_redis),
+                ("routes", self.compile_routes),
+            ):
+                try:
+                    await step()
+                    checks[name] = "ok"
+                except Exception as e:
+                    app_logger.warning(f"Warm-up step {name} failed: {type(e).__name__}: {e}")
+                    checks[name] = f"{type(e).__name__}: {e}"[:200]
+            self.checks = checks
+            self.seconds = time.perf_counter() - start
+            self.ready = all(result == "ok" for result in checks.values())
+            return self.ready
+
+    def retry_in_background(self) -> None:
+        """Start another warm-up attempt unless one is already running; doesn't wait for it."""
+        if self.ready or (self._retry is not None and not self._retry.done()):
+            return
+        self._retry = asyncio.get_running_loop().create_task(self.run())
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "checks": self.checks,
+            "warmup_seconds": round(self.seconds, 3) if self.seconds is not None else None,
+        }
+
+    async def prefill_pool(self) -> None:
+        """Open up to DB_POOL_SIZE connections at once and prime each; they stay in the pool."""
+        async def open_connection() -> None:
+            async with engine.connect() as conn:
+                async with AsyncSession(bind=conn) as session:
+                    await prime_queries(session)
+
+        count = min(self.connections, env_config.DB_POOL_SIZE)
+        await asyncio.gather(*(open_connection() for _ in range(count)))
+
+    async def ping_redis(self) -> None:
+        await asyncio.gather(token_blocklist.ping(), bulk_mail_store.ping(), recent_writes.ping())
+
+    async def compile_routes(self) -> None:
+        # goes through every middleware, the router and response serialization once
+        transport = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            response = await client.get("/test")
+            response.raise_for_status()
@@ -0,0 +1,61 @@
+import json
+import os
+import urllib.request
+from typing import List, Protocol
+
+from .spans import Span
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class JsonlFileExporter:
+    """Appends one JSON object per span to a local file, for offline analysis."""
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Span]) -> None:
+        self._file.write("".join(json.dumps(span.to_dict()) + "\n" for span in spans))
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+class OTLPHttpExporter:
+    """
+    Posts spans as OTLP/HTTP JSON (e.g. http://collector:4318/v1/traces),
+    which any OpenTelemetry collector accepts, without the OpenTelemetry SDK.
+    """
+    def __init__(self, endpoint: str, service_name: str = "bookly-api", timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "bookly"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def shutdown(self) -> None:
+        pass
@@ -0,0 +1,174 @@
+"""
+Request tracing.
+
+TracingMiddleware opens a root span per sampled request, and everything
+decorated with @traced (or every method of a class decorated with
+@trace_methods) records a child span while a trace is active. Unsampled
+requests cost one context variable lookup per decorated call.
+
+Finished spans are handed to a background thread that exports them in
+batches, to a JSONL file (TRACE_EXPORTER=jsonl) or to an OTLP/HTTP
+collector (TRACE_EXPORTER=otlp). TRACE_SAMPLE_RATE=0 disables tracing.
+"""
+import atexit
+import functools
+import inspect
+import queue
+import random
+import re
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List
+
+from config import env_config
+from logger.app_logger import app_logger
+from .exporters import JsonlFileExporter, OTLPHttpExporter, SpanExporter
+from .spans import Span
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class SpanBatcher:
+    """Exports finished spans from a daemon thread; a full queue drops spans rather than blocking requests."""
+    def __init__(self, exporter: SpanExporter, max_queue_size: int = 10000,
+                 batch_size: int = 256, interval: float = 2.0) -> None:
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> List[Span]:
+        spans = []
+        while len(spans) < self.batch_size:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return spans
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            app_logger.warning(f"Dropped {len(spans)} spans, export failed: {type(e).__name__}: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            while spans := self._drain():
+                self._export(spans)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        while spans := self._drain():
+            self._export(spans)
+        self.exporter.shutdown()
+
+
+class Tracer:
+    def __init__(self, batcher: SpanBatcher | None, sample_rate: float) -> None:
+        self.batcher = batcher
+        self.sample_rate = sample_rate if batcher is not None else 0.0
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span | None]:
+        """
+        The root span of a request. An incoming W3C traceparent header keeps the
+        caller's trace id and sampling decision; otherwise TRACE_SAMPLE_RATE
+        decides.
+        """
+        match = TRACEPARENT.match(traceparent or "")
+        if match:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = self.batcher is not None and int(match.group(3), 16) & 1
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled:
+            yield None
+            return
+        span = Span(name, trace_id, parent_id, kind="server", **attributes)
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(name, parent.trace_id, parent.span_id, **attributes)
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[None]:
+        token = _current_span.set(span)
+        try:
+            yield
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self.batcher.submit(span)
+
+
+def build_tracer() -> Tracer:
+    if env_config.TRACE_SAMPLE_RATE <= 0:
+        return Tracer(None, 0.0)
+    if env_config.TRACE_EXPORTER == "otlp":
+        exporter = OTLPHttpExporter(env_config.TRACE_OTLP_ENDPOINT, env_config.TRACE_SERVICE_NAME)
+    else:
+        exporter = JsonlFileExporter(env_config.TRACE_FILE)
+    batcher = SpanBatcher(exporter)
+    atexit.register(batcher.shutdown)
+    return Tracer(batcher, env_config.TRACE_SAMPLE_RATE)
+
+
+tracer = build_tracer()
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Record a span around every call of the decorated function (sync or async)."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator: trace every public method as "<ClassName>.<method>"."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.isfunction(value):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls